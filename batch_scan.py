@@ -0,0 +1,160 @@
+"""Ekran görüntüsü klasörlerini ekransız (headless) toplu tanıma.
+
+Overlay'deki kırpma + eşleştirme zincirini her görüntüye uygular ve görüntü
+başına bir JSON satırı yazar. Görüntüler süreç havuzunda paralel işlenir.
+
+    python batch_scan.py archive/ --jobs 8 --out labels.jsonl
+    python batch_scan.py "screenshots/*.png" --rect 313 91 1928 620
+    python batch_scan.py archive/ --out labels.jsonl --resume
+    python batch_scan.py archive/ --layout fixed   # kalibrasyonu yok say
+
+Kırpma, görüntünün çözünürlüğü için kaydedilmiş kalibrasyonu
+(cache/calibration.json) kullanır; o çözünürlükte kayıt yoksa sabit oranlar.
+"""
+import argparse, contextlib, glob, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+
+import calibration
+from recognizer import RecognitionEngine, find_loading_dir
+from spell_icons import SPELL_MATCHERS, DEFAULT_SPELL_MATCHER
+from splash_index import SplashIndex
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+_engine = None   # süreç başına bir motor (initializer kurar)
+_layouts = None  # kalibrasyon dosyası (None = sabit oranlar)
+_layout_cache = {}   # (w, h) -> o çözünürlükte kayıtlı kart sıraları
+
+
+def collect_images(inputs):
+    """Klasör, glob veya dosya yollarını sıralı ve tekrarsız görüntü listesine çevirir."""
+    out, seen = [], set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths = sorted(p for p in glob.glob(os.path.join(item, "**", "*"), recursive=True)
+                           if p.lower().endswith(IMAGE_EXTS))
+        elif any(ch in item for ch in "*?["):
+            paths = sorted(glob.glob(item, recursive=True))
+        else:
+            paths = [item]
+        for p in paths:
+            if p not in seen:
+                seen.add(p)
+                out.append(p)
+    return out
+
+
+def _init_worker(roster, spell_matcher=DEFAULT_SPELL_MATCHER, layouts=None):
+    global _engine, _layouts
+    sys.stdout = sys.stderr  # modül logları json akışına karışmasın
+    _engine = RecognitionEngine(workers=1, roster=roster, spell_matcher=spell_matcher)
+    _engine.load_index(update=False)  # ana süreç güncelledi, yalnızca mmap
+    _engine.warm()
+    _layouts = layouts
+
+
+def _layout(size, rect):
+    # görüntü çözünürlüğü için kayıtlı sıra, seçim koordinatlarında (yoksa None)
+    if not _layouts:
+        return None
+    if size not in _layout_cache:
+        _layout_cache[size] = calibration.load_layouts(size, _layouts)
+    return calibration.layout_for_rect(_layout_cache[size], rect or (0, 0) + size)
+
+
+def _process(job):
+    path, rect = job
+    t0 = time.perf_counter()
+    rec = {"image": path}
+    try:
+        img = cv2.imread(path)
+        if img is None:
+            raise ValueError("görüntü okunamadı")
+        layout = _layout(img.shape[1::-1], rect)
+        if rect:
+            x, y, w, h = rect
+            img = img[y:y + h, x:x + w]
+            if img.size == 0:
+                raise ValueError("rect görüntünün dışında")
+        rec.update(_engine.recognize(img, parallel=False, layout=layout).to_dict())
+    except Exception as e:
+        rec["error"] = str(e)
+    rec["ms"] = round((time.perf_counter() - t0) * 1000.0, 1)   # okuma dahil
+    return rec
+
+
+def _done_images(out_path):
+    done = set()
+    if not out_path or not os.path.exists(out_path):
+        return done
+    with open(out_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # yarım kalmış son satır
+            if "error" not in rec:
+                done.add(rec.get("image"))
+    return done
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Ekran görüntülerini toplu tanı (JSON lines)")
+    ap.add_argument("inputs", nargs="+", help="görüntü dosyası, klasör veya glob")
+    ap.add_argument("--rect", type=int, nargs=4, metavar=("X", "Y", "W", "H"),
+                    help="seçim alanı (varsayılan: görüntünün tamamı)")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="süreç sayısı")
+    ap.add_argument("--loading-dir", default=None, help="splash klasörü (varsayılan: otomatik)")
+    ap.add_argument("--roster", type=lambda v: [n.strip() for n in v.split(",") if n.strip()],
+                    default=None, help="yalnızca bu şampiyonlar aransın (virgülle ayrılmış)")
+    ap.add_argument("--spell-matcher", choices=SPELL_MATCHERS, default=DEFAULT_SPELL_MATCHER,
+                    help="spell eşleştirme yöntemi")
+    ap.add_argument("--layout", default=calibration.CACHE_PATH,
+                    help='kalibrasyon dosyası ("fixed": sabit kırpma oranları)')
+    ap.add_argument("--out", default=None, help="çıktı .jsonl (varsayılan: stdout)")
+    ap.add_argument("--resume", action="store_true", help="--out'ta zaten olan görüntüleri atla")
+    args = ap.parse_args(argv)
+
+    images = collect_images(args.inputs)
+    if args.resume:
+        done = _done_images(args.out)
+        images = [p for p in images if p not in done]
+    if not images:
+        print("[-] İşlenecek görüntü yok.", file=sys.stderr)
+        return 0
+
+    # indeksi süreçler başlamadan bir kez güncelle; işçiler yalnızca açar (mmap).
+    # loading klasörü yoksa hazırlanmış splash deposu kullanılır.
+    with contextlib.redirect_stdout(sys.stderr):
+        index = SplashIndex.load_or_build(args.loading_dir or find_loading_dir())
+    if not index:
+        print("[-] Splash indeksi kurulamadı (loading klasörü ve splash deposu yok).", file=sys.stderr)
+        return 1
+
+    jobs = max(1, args.jobs)
+    print(f"[i] {len(images)} görüntü, {jobs} süreç", file=sys.stderr)
+    out = open(args.out, "a" if args.resume else "w", encoding="utf-8") if args.out else sys.stdout
+    t0, errors = time.perf_counter(), 0
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(args.roster, args.spell_matcher,
+                                           None if args.layout == "fixed" else args.layout)) as pool:
+            work = ((p, args.rect) for p in images)
+            for n, rec in enumerate(pool.map(_process, work, chunksize=4), start=1):
+                errors += "error" in rec
+                out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                out.flush()
+                if n % 100 == 0:
+                    print(f"[i] {n}/{len(images)}", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"[✓] {len(images)} görüntü {time.perf_counter() - t0:.1f} sn'de işlendi"
+          f" ({errors} hata)", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
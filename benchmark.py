@@ -0,0 +1,301 @@
+"""Tanıma zinciri için çevrimdışı benchmark (Qt ve canlı ekran gerekmez).
+
+benchmark_labels.json'daki her görüntü, overlay'in izlediği yoldan geçirilir:
+kırpma (extract_crops) -> spell eşleştirme -> splash eşleştirme. Aşama başına
+gecikme yüzdelikleri, tepe bellek ve etiketlere göre top-1 doğruluk JSON olarak
+yazılır. --compare ile önceki bir çıktıya göre gerileme kontrolü yapılır.
+
+    python benchmark.py --repeat 3 --out bench.json
+    python benchmark.py --compare bench.json
+    python benchmark.py --spell-matcher ncc --compare bench.json   # NCC'yi ORB'ye karşı ölç
+    python benchmark.py --layout fixed     # kalibrasyonu yok say, sabit kırpma oranları
+
+Kırpma, overlay'deki gibi görüntünün çözünürlüğü için kaydedilmiş kalibrasyonu
+(cache/calibration.json) kullanır; o çözünürlükte kalibrasyon yoksa sabit oranlar.
+"""
+import argparse, contextlib, json, os, platform, subprocess, sys, time, tracemalloc
+from concurrent.futures import wait
+import cv2
+import numpy as np
+
+import calibration
+from crops import extract_crops
+from spell_icons import SPELL_MATCHERS, DEFAULT_SPELL_MATCHER
+from recognizer import (RecognitionEngine, Match, SplashMatch, DEFAULT_WORKERS, assign_unique,
+                        find_loading_dir)
+
+try:
+    import resource  # yalnızca unix
+except ImportError:
+    resource = None
+
+_BASE = os.path.dirname(os.path.abspath(__file__))
+LABELS_PATH = os.path.join(_BASE, "benchmark_labels.json")
+PERCENTILES = (50, 90, 95, 99)
+
+# --compare eşikleri
+MAX_SLOWDOWN = 0.20        # p50 süresi %20'den fazla artarsa gerileme
+MAX_ACCURACY_DROP = 0.0    # doğruluk hiç düşmemeli
+
+
+def load_cases(path):
+    with open(path, "r", encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+    for c in cases:
+        if not os.path.isabs(c["image"]):
+            c["image"] = os.path.join(os.path.dirname(os.path.abspath(path)), c["image"])
+    return cases
+
+
+def read_case(case):
+    img = cv2.imread(case["image"])
+    if img is None:
+        raise FileNotFoundError(case["image"])
+    if case.get("rect"):
+        x, y, w, h = case["rect"]
+        img = img[y:y + h, x:x + w]
+    return img
+
+
+def case_layout(case, layouts=calibration.CACHE_PATH):
+    """Vakanın ekran çözünürlüğü için kayıtlı kart sırası, seçim koordinatlarında.
+
+    layouts: kalibrasyon dosyası; "fixed" veya None ise (ya da o çözünürlükte
+    kayıt yoksa) None döner ve sabit oranlar kullanılır.
+    """
+    if not layouts or layouts == "fixed":
+        return None
+    img = cv2.imread(case["image"])
+    if img is None:
+        raise FileNotFoundError(case["image"])
+    h, w = img.shape[:2]
+    return calibration.layout_for_image((w, h), case.get("rect"), layouts)
+
+
+def _ms(t0):
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def _stats(samples):
+    a = np.asarray(samples, dtype=np.float64)
+    if a.size == 0:
+        return {}
+    out = {f"p{p}": round(float(np.percentile(a, p)), 2) for p in PERCENTILES}
+    out.update(mean=round(float(a.mean()), 2), max=round(float(a.max()), 2), n=int(a.size))
+    return out
+
+
+def _rss_peak_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux kB, macOS byte döner
+    return round(peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 1)
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=_BASE,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+class Scorer:
+    """Tahminleri etiketlerle karşılaştırır. Etiket None ise '?' beklenir.
+
+    Kalibrasyon için en iyi adayın olasılığı ile doğru çıkıp çıkmadığı da
+    tutulur (Brier skoru: düşük = olasılıklar gerçeğe yakın).
+    """
+
+    def __init__(self):
+        self.counts = {"champion": [0, 0], "spell": [0, 0]}   # [doğru, toplam]
+        self.calib = {"champion": [], "spell": []}             # [(olasılık, top-1 doğru mu)]
+        self.misses = []
+
+    def add(self, kind, case, panel, expected, got, m, slot=None):
+        ok = (got == "?") if expected is None else (got == expected)
+        self.counts[kind][0] += ok
+        self.counts[kind][1] += 1
+        self.calib[kind].append((m.confidence, m.name == expected))
+        if not ok:
+            miss = {"image": os.path.relpath(case["image"], _BASE), "rect": case.get("rect"),
+                    "panel": panel + 1, "kind": kind, "expected": expected, "got": got,
+                    "score": round(float(m.score), 1), "confidence": m.confidence,
+                    "candidates": [n for n, _, _ in m.candidates]}
+            if slot is not None:
+                miss["slot"] = slot + 1
+            self.misses.append(miss)
+
+    def summary(self):
+        out = {}
+        for k, (c, t) in self.counts.items():
+            pairs = np.asarray(self.calib[k], dtype=np.float64).reshape(-1, 2)
+            brier = float(np.mean((pairs[:, 0] - pairs[:, 1]) ** 2)) if len(pairs) else None
+            out[k] = {"correct": c, "total": t, "top1": round(c / t, 4) if t else None,
+                      "brier": None if brier is None else round(brier, 4)}
+        return out
+
+
+def run(cases, repeat=3, workers=DEFAULT_WORKERS, loading_dir=None, early_exit=True,
+        roster_from_labels=False, spell_matcher=DEFAULT_SPELL_MATCHER,
+        layouts=calibration.CACHE_PATH):
+    tracemalloc.start()
+    stages = {k: [] for k in ("decode", "extract", "spells", "splash", "sequential", "parallel")}
+    evaluated = []   # panel başına RANSAC ile doğrulanan splash adayı
+
+    t0 = time.perf_counter()
+    engine = RecognitionEngine(workers=workers, spell_matcher=spell_matcher)
+    if not early_exit:
+        engine.early_exit_score = None
+    if not engine.load_index(loading_dir or find_loading_dir()):
+        raise RuntimeError("splash indeksi yüklenemedi")
+    engine.warm()
+    load_ms = _ms(t0)
+
+    scorer = Scorer()
+    case_layouts = [case_layout(c, layouts) for c in cases]
+    calibrated = sum(l is not None for l in case_layouts)
+    if calibrated:
+        print(f"[i] kalibrasyon: {calibrated}/{len(cases)} görüntüde kayıtlı kart sırası kullanılıyor")
+    try:
+        for r in range(repeat):
+            for case, layout in zip(cases, case_layouts):
+                t = time.perf_counter()
+                img = read_case(case)
+                stages["decode"].append(_ms(t))
+
+                t_seq = time.perf_counter()
+                t = time.perf_counter()
+                panels = extract_crops(img, layout)
+                stages["extract"].append(_ms(t))
+
+                t = time.perf_counter()
+                spells = [[engine.match_spell(c) if c.size else Match() for c in p["spells"]]
+                          for p in panels]
+                stages["spells"].append(_ms(t))
+
+                # kadro biliniyormuş gibi: etiketteki şampiyonlarla sınırla (negatiflerde yok)
+                roster = [c for c in case["champions"] if c] if roster_from_labels else None
+                champ_ids = engine._roster_ids(roster)
+                t = time.perf_counter()
+                splashes = [engine.match_splash_ex(p["splash"], champ_ids) if p["splash"].size
+                            else SplashMatch() for p in panels]
+                if engine.unique_champions:
+                    splashes = assign_unique(splashes, calibrator=engine.calibrator)
+                stages["splash"].append(_ms(t))
+                evaluated += [m.evaluated for m in splashes]
+                stages["sequential"].append(_ms(t_seq))
+
+                # overlay'deki gibi: kırpma + havuzda paralel eşleştirme
+                t = time.perf_counter()
+                wait(engine.recognize_async(img, roster=roster, layout=layout))
+                stages["parallel"].append(_ms(t))
+
+                if r:
+                    continue  # sonuçlar deterministik, doğruluk bir kez sayılır
+                for i, m in enumerate(splashes):
+                    if i < len(case["champions"]):
+                        got = m.name if m.confident else "?"
+                        scorer.add("champion", case, i, case["champions"][i], got, m)
+                for i, pair in enumerate(spells):
+                    if i >= len(case["spells"]):
+                        continue
+                    for j, m in enumerate(pair):
+                        got = m.name if m.confident else "?"
+                        scorer.add("spell", case, i, case["spells"][i][j], got, m, slot=j)
+        _, traced_peak = tracemalloc.get_traced_memory()
+        index_mem = engine.splash_index.memory_usage()
+    finally:
+        tracemalloc.stop()
+        engine.shutdown()
+
+    return {
+        "version": _git_rev(),
+        "platform": {"python": platform.python_version(), "opencv": cv2.__version__,
+                     "numpy": np.__version__, "machine": platform.machine(),
+                     "cpus": os.cpu_count()},
+        "config": {"repeat": repeat, "workers": engine.workers, "cases": len(cases),
+                   "splash_entries": len(engine.splash_index),
+                   "confidence_thresholds": {k: m.threshold for k, m in engine.calibrator.models.items()},
+                   "early_exit_score": engine.early_exit_score,
+                   "early_exit_margin": engine.early_exit_margin,
+                   "unique_champions": engine.unique_champions,
+                   "roster_from_labels": roster_from_labels,
+                   "spell_matcher": engine.icons.method,
+                   "calibrated_cases": calibrated},
+        "load_ms": round(load_ms, 1),
+        "stages_ms": {k: _stats(v) for k, v in stages.items()},
+        "splash_candidates_evaluated": _stats(evaluated),
+        "memory_mb": {"tracemalloc_peak": round(traced_peak / (1024.0 * 1024.0), 1),
+                      "rss_peak": _rss_peak_mb(),
+                      "index_mapped": round(index_mem["mapped"] / (1024.0 * 1024.0), 1),
+                      "index_resident": (None if index_mem["resident"] is None else
+                                         round(index_mem["resident"] / (1024.0 * 1024.0), 1))},
+        "accuracy": scorer.summary(),
+        "misses": scorer.misses,
+    }
+
+
+def compare(current, previous):
+    """Önceki sonuca göre gerilemeleri listeler (boş liste = sorun yok)."""
+    problems = []
+    for stage, cur in current["stages_ms"].items():
+        prev = previous.get("stages_ms", {}).get(stage)
+        if cur and prev and prev.get("p50"):
+            ratio = cur["p50"] / prev["p50"] - 1.0
+            if ratio > MAX_SLOWDOWN:
+                problems.append(f"{stage}: p50 {prev['p50']} -> {cur['p50']} ms (+{ratio:.0%})")
+    for kind, cur in current["accuracy"].items():
+        prev = previous.get("accuracy", {}).get(kind)
+        if cur["top1"] is not None and prev and prev.get("top1") is not None:
+            if prev["top1"] - cur["top1"] > MAX_ACCURACY_DROP:
+                problems.append(f"{kind}: top-1 {prev['top1']} -> {cur['top1']}")
+    return problems
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="LoL-SplashScanner tanıma benchmark'ı")
+    ap.add_argument("--labels", default=LABELS_PATH, help="etiket dosyası (json)")
+    ap.add_argument("--repeat", type=int, default=3, help="her görüntü kaç kez taransın")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="paralel aşama için iş parçacığı")
+    ap.add_argument("--loading-dir", default=None, help="splash klasörü (varsayılan: otomatik)")
+    ap.add_argument("--no-early-exit", action="store_true", help="splash adaylarının hepsini doğrula")
+    ap.add_argument("--roster-from-labels", action="store_true",
+                    help="splash aramasını etiketteki şampiyonlarla sınırla (kadro bilinen senaryo)")
+    ap.add_argument("--spell-matcher", choices=SPELL_MATCHERS, default=DEFAULT_SPELL_MATCHER,
+                    help="spell eşleştirme yöntemi")
+    ap.add_argument("--layout", default=calibration.CACHE_PATH,
+                    help='kalibrasyon dosyası ("fixed": sabit kırpma oranları)')
+    ap.add_argument("--out", default=None, help="sonuç json dosyası (varsayılan: stdout)")
+    ap.add_argument("--compare", default=None, help="önceki sonuç json'u; gerileme varsa çıkış kodu 1")
+    args = ap.parse_args(argv)
+
+    # modüllerin [+]/[i] logları stdout'taki json'a karışmasın
+    with contextlib.redirect_stdout(sys.stderr):
+        result = run(load_cases(args.labels), repeat=max(1, args.repeat),
+                     workers=args.workers, loading_dir=args.loading_dir,
+                     early_exit=not args.no_early_exit,
+                     roster_from_labels=args.roster_from_labels,
+                     spell_matcher=args.spell_matcher, layouts=args.layout)
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"[✓] Benchmark sonucu kaydedildi: {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            problems = compare(result, json.load(f))
+        for p in problems:
+            print(f"[!] gerileme: {p}", file=sys.stderr)
+        if problems:
+            return 1
+        print("[✓] gerileme yok", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
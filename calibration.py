@@ -0,0 +1,302 @@
+"""Kırpma geometrisinin otomatik kalibrasyonu.
+
+crops.extract_crops varsayılan olarak seçim kutusuna göre sabit oranlar
+kullanır; çözünürlük veya arayüz ölçeği değişince kırpımlar sessizce kayar.
+Kalibrasyon bir ekran görüntüsünde kart çerçevelerini ve spell yuvalarını bir
+kez bulur:
+
+* Kartlar: altın çerçevenin uzun dikey/yatay kenarları. Sütun başına güçlü
+  yatay gradyanlı satır oranı (projeksiyon profili) çıkarılır; 5 eşit genişlikli,
+  eşit aralıklı kartın 10 kenarını en iyi açıklayan (x0, genişlik, adım) aranır.
+  Satırlar (üst/alt kenarlar) aynı şekilde kart sütunlarının içinden bulunur.
+* Spell yuvaları: assets/icons ikonlarıyla kartın sağ alt bölgesinde çok
+  ölçekli şablon eşleştirme; iki en iyi tepe, 5 kartın medyanı alınır.
+
+Sonuç ekran çözünürlüğü başına cache/calibration.json'a yazılır; sonraki
+taramalar geometriyi dosyadan okur, tespit tekrar çalışmaz.
+
+    python calibration.py screenshots/ss.png     # tespit edilen kutuları yazdırır
+"""
+import glob, json, os, sys, time
+from dataclasses import dataclass, field
+from typing import List, Tuple
+import cv2
+import numpy as np
+
+from crops import NUM_PANELS, SPELL_BOXES, SPELL_ROI_Y0, SPELL_ROI_Y1
+from spell_icons import ICON_DIR
+
+_BASE = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(_BASE, "cache", "calibration.json")
+CACHE_VERSION = 1
+
+EDGE_THRESHOLD = 40.0      # Sobel büyüklüğü; altın çerçeve kenarları bunun çok üstünde
+MIN_EDGE_SCORE = 0.6       # 10 kart kenarının ortalama profil değeri (0..1)
+CARD_ASPECT = (1.5, 2.2)   # kart yüksekliği / genişliği
+SNAP_PX = 6                # kart kenarı, ortak modelden en fazla bu kadar sapabilir
+
+# spell yuvası araması: kartın sağ alt bölgesi, ikon kenarı kart genişliğine oranla
+SPELL_SEARCH = (0.50, 1.00, 0.70, 0.97)   # (fx0, fx1, fy0, fy1)
+SPELL_SCALES = (0.07, 0.17, 14)           # (en küçük, en büyük, adım sayısı)
+MIN_SPELL_SCORE = 0.5                     # TM_CCOEFF_NORMED
+
+
+@dataclass
+class CardLayout:
+    """Bir kart sırasının geometrisi.
+
+    cards piksel cinsindendir (kalibrasyon görüntüsünün / ekranın koordinatları);
+    spell_boxes kart dikdörtgenine göre oranlardır: (fx0, fx1, fy0, fy1).
+    """
+    cards: List[Tuple[int, int, int, int]]
+    spell_boxes: List[Tuple[float, float, float, float]] = field(default_factory=list)
+    score: float = 0.0
+
+    def bounds(self):
+        x0 = min(x for x, _, _, _ in self.cards)
+        y0 = min(y for _, y, _, _ in self.cards)
+        x1 = max(x + w for x, _, w, _ in self.cards)
+        y1 = max(y + h for _, y, _, h in self.cards)
+        return x0, y0, x1 - x0, y1 - y0
+
+    def shifted(self, dx, dy):
+        return CardLayout([(x + dx, y + dy, w, h) for x, y, w, h in self.cards],
+                          list(self.spell_boxes), self.score)
+
+    def to_dict(self):
+        return {"cards": [list(c) for c in self.cards],
+                "spell_boxes": [[round(v, 4) for v in b] for b in self.spell_boxes],
+                "score": round(self.score, 3)}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls([tuple(c) for c in d["cards"]], [tuple(b) for b in d["spell_boxes"]],
+                   d.get("score", 0.0))
+
+
+def default_spell_boxes():
+    """crops.py'deki sabit oranlar (kalibrasyon spell yuvası bulamazsa)."""
+    return [(fx0, fx1, SPELL_ROI_Y0, SPELL_ROI_Y1) for fx0, fx1 in SPELL_BOXES]
+
+
+def _gray(img):
+    g = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    return g.astype(np.float32)
+
+
+def _peaks(prof, thr, merge=4):
+    # eşik üstü bitişik bölgelerin en yüksek noktası
+    out = []
+    for i in np.flatnonzero(prof >= thr):
+        if out and i - out[-1][-1] <= merge:
+            out[-1].append(i)
+        else:
+            out.append([i])
+    return [int(max(g, key=lambda j: prof[j])) for g in out]
+
+
+def _at(prof, x, r=2):
+    if x < 0 or x >= len(prof):
+        return 0.0
+    return float(prof[max(0, x - r):x + r + 1].max())
+
+
+def _snap(cand, x, r=SNAP_PX):
+    # adım tam sayı değil; son kartlarda birkaç piksellik kaymayı en yakın kenar düzeltir
+    near = min(cand, key=lambda c: abs(c - x))
+    return near if abs(near - x) <= r else x
+
+
+def _detect_columns(g, n):
+    """Kart sütunları: [(x, w), ...] ve ortalama kenar skoru."""
+    W = g.shape[1]
+    gx = np.abs(cv2.Sobel(g, cv2.CV_32F, 1, 0, ksize=3))
+    prof = (gx > EDGE_THRESHOLD).mean(axis=0)
+    cand = _peaks(prof, 0.5 * prof.max())
+    best, best_score = None, 0.0
+    for a in cand:
+        for b in cand:
+            w = b - a
+            if w < W * 0.5 / (n * 1.6):
+                continue
+            for c in cand:
+                pitch = c - a
+                if pitch <= w or pitch > 1.6 * w or a + (n - 1) * pitch + w > W + 2:
+                    continue
+                s = sum(_at(prof, a + i * pitch) + _at(prof, a + i * pitch + w) for i in range(n)) / (2 * n)
+                if s > best_score:
+                    best, best_score = (a, w, pitch), s
+    if best is None:
+        return [], 0.0
+    a, w, pitch = best
+    cols = []
+    for i in range(n):
+        x0, x1 = _snap(cand, a + i * pitch), _snap(cand, a + i * pitch + w)
+        cols.append((x0, x1 - x0))
+    return cols, best_score
+
+
+def _detect_rows(g, cols):
+    """Kart satırları: [(y, h, skor), ...] yukarıdan aşağıya."""
+    gy = np.abs(cv2.Sobel(g, cv2.CV_32F, 0, 1, ksize=3))
+    xs = np.concatenate([np.arange(x + 4, x + w - 4) for x, w in cols])
+    prof = (gy[:, xs] > EDGE_THRESHOLD).mean(axis=1)
+    w = float(np.median([w for _, w in cols]))
+    cand = _peaks(prof, 0.5)
+    pairs = []
+    for t in cand:
+        for b in cand:
+            h = b - t
+            if CARD_ASPECT[0] * w <= h <= CARD_ASPECT[1] * w:
+                pairs.append(((prof[t] + prof[b]) / 2.0, h, t))
+    # eşit skorda kısa olan: iki sıranın üst ve alt kenarı tek "kart" sayılmasın
+    pairs.sort(key=lambda p: (-p[0], p[1]))
+    rows = []
+    for s, h, t in pairs:
+        if s < MIN_EDGE_SCORE:
+            break
+        if all(t + h < y or t > y + hh for y, hh, _ in rows):
+            rows.append((t, h, float(s)))
+    return sorted(rows)
+
+
+def _icon_templates(icons_dir=ICON_DIR):
+    out = []
+    for p in sorted(glob.glob(os.path.join(icons_dir, "*.png"))):
+        icon = cv2.imread(p, cv2.IMREAD_COLOR)
+        if icon is not None:
+            out.append(cv2.cvtColor(icon, cv2.COLOR_BGR2GRAY))
+    return out
+
+
+def _card_spell_slots(g, card, icons):
+    """Tek kartta iki spell yuvası: (skor, [(fx0, fx1, fy0, fy1), ...])."""
+    if not icons:   # ikon şablonu yok: calibrate sabit spell kutularına düşer
+        return 0.0, None
+    x, y, w, h = card
+    sx0, sx1, sy0, sy1 = SPELL_SEARCH
+    rx0, rx1, ry0, ry1 = x + int(w * sx0), x + int(w * sx1), y + int(h * sy0), y + int(h * sy1)
+    roi = g[ry0:ry1, rx0:rx1]
+    best = (0.0, None)
+    for s in np.geomspace(SPELL_SCALES[0] * w, SPELL_SCALES[1] * w, SPELL_SCALES[2]):
+        s = int(round(s))
+        if s < 8 or s >= min(roi.shape):
+            continue
+        resp = None
+        for icon in icons:
+            r = cv2.matchTemplate(roi, cv2.resize(icon, (s, s), interpolation=cv2.INTER_AREA),
+                                  cv2.TM_CCOEFF_NORMED)
+            resp = r if resp is None else np.maximum(resp, r)
+        _, v1, _, p1 = cv2.minMaxLoc(resp)
+        resp[max(0, p1[1] - s):p1[1] + s, max(0, p1[0] - s):p1[0] + s] = -1.0
+        _, v2, _, p2 = cv2.minMaxLoc(resp)
+        score = (v1 + v2) / 2.0
+        if score > best[0]:
+            boxes = [((rx0 + px - x) / w, (rx0 + px + s - x) / w, (ry0 + py - y) / h, (ry0 + py + s - y) / h)
+                     for px, py in sorted([p1, p2])]
+            best = (score, boxes)
+    return best
+
+
+def _spell_slots(g, cards, icons):
+    found = [b for s, b in (_card_spell_slots(g, c, icons) for c in cards)
+             if b is not None and s >= MIN_SPELL_SCORE]
+    if len(found) < (len(cards) + 1) // 2:
+        return None
+    return [tuple(float(v) for v in np.median([f[k] for f in found], axis=0)) for k in range(2)]
+
+
+def calibrate(img, n=NUM_PANELS, icons=None):
+    """Görüntüdeki kart sıralarını bulur; her sıra için bir CardLayout (yukarıdan aşağıya)."""
+    g = _gray(img)
+    cols, col_score = _detect_columns(g, n)
+    if not cols or col_score < MIN_EDGE_SCORE:
+        return []
+    icons = _icon_templates() if icons is None else icons
+    gu8 = g.astype(np.uint8)
+    layouts = []
+    for y, h, row_score in _detect_rows(g, cols):
+        cards = [(x, y, w, h) for x, w in cols]
+        boxes = _spell_slots(gu8, cards, icons)
+        if boxes is None:
+            print(f"[!] kalibrasyon: y={y} sırasında spell yuvası bulunamadı, sabit oranlar kullanılacak")
+            boxes = default_spell_boxes()
+        layouts.append(CardLayout(cards, boxes, min(col_score, row_score)))
+    return layouts
+
+
+def layout_for_rect(layouts, rect):
+    """Seçim dikdörtgenini (x, y, w, h; ekran) kapsayan sırayı seçim koordinatlarına çevirir.
+
+    Kart merkezlerinin hepsi seçimin içindeyse o sıra kullanılır, yoksa None
+    (crops sabit oranlara döner).
+    """
+    rx, ry, rw, rh = rect
+    for lay in layouts or ():
+        if all(rx <= x + w / 2 < rx + rw and ry <= y + h / 2 < ry + rh for x, y, w, h in lay.cards):
+            shifted = lay.shifted(-rx, -ry)
+            cards = []
+            for x, y, w, h in shifted.cards:   # seçim dışına taşan kısım kırpılır
+                x0, y0 = max(0, x), max(0, y)
+                cards.append((x0, y0, min(rw, x + w) - x0, min(rh, y + h) - y0))
+            shifted.cards = cards
+            return shifted
+    return None
+
+
+def layout_for_image(size, rect=None, path=CACHE_PATH):
+    """Tam ekran görüntüsü (w, h) için kayıtlı sıralardan seçimi kapsayanı döner.
+
+    rect verilmezse görüntünün tamamı seçim sayılır. Sonuç seçim koordinatlarındadır;
+    bu çözünürlükte kalibrasyon yoksa None (crops sabit oranlara döner).
+    """
+    w, h = size
+    return layout_for_rect(load_layouts((w, h), path), rect or (0, 0, w, h))
+
+
+# --- çözünürlük başına önbellek ---
+
+def _resolution_key(resolution):
+    w, h = resolution
+    return f"{int(w)}x{int(h)}"
+
+
+def _read_cache(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("screens", {}) if data.get("version") == CACHE_VERSION else {}
+
+
+def load_layouts(resolution, path=CACHE_PATH):
+    """Bu çözünürlük için kaydedilmiş sıralar (kalibrasyon yapılmadıysa boş liste)."""
+    entry = _read_cache(path).get(_resolution_key(resolution))
+    return [CardLayout.from_dict(d) for d in entry["rows"]] if entry else []
+
+
+def save_layouts(resolution, layouts, path=CACHE_PATH):
+    screens = _read_cache(path)
+    screens[_resolution_key(resolution)] = {"rows": [l.to_dict() for l in layouts],
+                                            "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "screens": screens}, f, indent=2)
+    os.replace(tmp, path)
+
+
+if __name__ == "__main__":
+    for p in sys.argv[1:]:
+        img = cv2.imread(p)
+        if img is None:
+            print(f"[-] okunamadı: {p}")
+            continue
+        t0 = time.perf_counter()
+        rows = calibrate(img)
+        ms = (time.perf_counter() - t0) * 1000.0
+        print(f"[i] {p}: {len(rows)} sıra ({ms:.0f} ms)")
+        for lay in rows:
+            print(f"    kartlar={lay.cards}")
+            print(f"    spell={[tuple(round(v, 3) for v in b) for b in lay.spell_boxes]} skor={lay.score:.2f}")
@@ -0,0 +1,314 @@
+import os, sys, glob, threading
+import ctypes, ctypes.util
+import cv2
+import numpy as np
+
+# Ekran yakalama arka uçları. Hepsi grab(x, y, w, h) ile BGR uint8 döner;
+# dönen dizi arka ucun yeniden kullanılan tamponudur, bir sonraki grab'de
+# üzerine yazılır (saklanacaksa .copy() alınmalı).
+#
+# Seçim sırası (auto): xshm (Linux/X11) -> mss -> pyautogui.
+# "replay:<glob>" testler/benchmark için diskteki görüntüleri sırayla döner.
+
+
+class CaptureBackend:
+    name = "base"
+
+    def __init__(self):
+        self._buf = None
+
+    def _buffer(self, w, h):
+        if self._buf is None or self._buf.shape[:2] != (h, w):
+            self._buf = np.empty((h, w, 3), dtype=np.uint8)
+        return self._buf
+
+    def grab(self, x, y, w, h):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiCapture(CaptureBackend):
+    """Eski yol: PIL görüntüsü -> np.array -> BGR. Her platformda çalışır ama yavaş."""
+    name = "pyautogui"
+
+    def __init__(self):
+        super().__init__()
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def grab(self, x, y, w, h):
+        ss = self._pyautogui.screenshot(region=(x, y, w, h))
+        return cv2.cvtColor(np.asarray(ss), cv2.COLOR_RGB2BGR, dst=self._buffer(w, h))
+
+
+class MssCapture(CaptureBackend):
+    """mss (opsiyonel bağımlılık): Windows'ta BitBlt, macOS'ta CoreGraphics."""
+    name = "mss"
+
+    def __init__(self):
+        super().__init__()
+        import mss
+        self._sct = mss.mss()
+
+    def grab(self, x, y, w, h):
+        shot = self._sct.grab({"left": x, "top": y, "width": w, "height": h})
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self._buffer(w, h))
+
+    def close(self):
+        self._sct.close()
+
+
+# --- X11 MIT-SHM ---
+class _XImage(ctypes.Structure):
+    _fields_ = [
+        ("width", ctypes.c_int), ("height", ctypes.c_int), ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int), ("data", ctypes.c_void_p), ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int), ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int), ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int), ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong), ("green_mask", ctypes.c_ulong), ("blue_mask", ctypes.c_ulong),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [("shmseg", ctypes.c_ulong), ("shmid", ctypes.c_int),
+                ("shmaddr", ctypes.c_void_p), ("readOnly", ctypes.c_int)]
+
+
+_XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+
+# Xlib hata işleyicisi süreç çapındadır: tüm XShmCapture nesneleri tek bir modül
+# işleyicisini paylaşır (referans sayılı). Son nesne kapanınca önceki işleyici
+# geri konur; nesneler hangi sırayla kapanırsa kapansın serbest bırakılmış bir
+# ctypes callback'i kurulu kalmaz. Hatalar bağlantı (Display*) başına işaretlenir.
+_x_errors = set()             # hata almış Display* adresleri
+_x_handler_lock = threading.Lock()
+_x_handler_refs = 0
+_x_handler_prev = None
+
+
+def _on_x_error(display, event):
+    _x_errors.add(display)
+    return 0
+
+
+_x_handler_cb = _XErrorHandler(_on_x_error)
+
+
+def _acquire_error_handler(x11):
+    global _x_handler_refs, _x_handler_prev
+    with _x_handler_lock:
+        if _x_handler_refs == 0:
+            _x_handler_prev = x11.XSetErrorHandler(ctypes.cast(_x_handler_cb, ctypes.c_void_p))
+        _x_handler_refs += 1
+
+
+def _release_error_handler(x11):
+    global _x_handler_refs, _x_handler_prev
+    with _x_handler_lock:
+        _x_handler_refs -= 1
+        if _x_handler_refs == 0:
+            x11.XSetErrorHandler(_x_handler_prev)
+            _x_handler_prev = None
+
+
+class XShmCapture(CaptureBackend):
+    """X11 paylaşımlı bellek yakalayıcı (XShmGetImage).
+
+    Sunucu pikselleri doğrudan paylaşımlı segmente yazar; tek kopya BGRA->BGR
+    dönüşümüdür. Segment, bölge boyutu değişmedikçe yeniden kullanılır.
+    X bağlantısı thread'e özeldir: nesne hangi thread'de oluşturulduysa orada kullanılmalı.
+    """
+    name = "xshm"
+    _ZPIXMAP = 2
+    _IPC_PRIVATE, _IPC_CREAT, _IPC_RMID = 0, 0o1000, 0
+
+    def __init__(self):
+        super().__init__()
+        if not sys.platform.startswith("linux") or not os.environ.get("DISPLAY"):
+            raise RuntimeError("X11 oturumu yok")
+        x11 = ctypes.util.find_library("X11")
+        xext = ctypes.util.find_library("Xext")
+        if not x11 or not xext:
+            raise RuntimeError("libX11/libXext bulunamadı")
+        self._x = ctypes.CDLL(x11)
+        self._xext = ctypes.CDLL(xext)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._declare()
+        self._img = self._shm = self._size = self._view = None
+
+        # varsayılan Xlib hata işleyicisi süreci sonlandırır; hatayı yakalayıp bayrak yapalım
+        _acquire_error_handler(self._x)
+        self._dpy = self._x.XOpenDisplay(None)
+        if not self._dpy:
+            _release_error_handler(self._x)
+            raise RuntimeError("X ekranı açılamadı")
+        if not self._xext.XShmQueryExtension(self._dpy):
+            self.close()
+            raise RuntimeError("MIT-SHM eklentisi yok")
+        scr = self._x.XDefaultScreen(self._dpy)
+        self._root = self._x.XRootWindow(self._dpy, scr)
+        self._visual = self._x.XDefaultVisual(self._dpy, scr)
+        self._depth = self._x.XDefaultDepth(self._dpy, scr)
+        self._screen_w = self._x.XDisplayWidth(self._dpy, scr)
+        self._screen_h = self._x.XDisplayHeight(self._dpy, scr)
+
+    def _declare(self):
+        x, xe, c = self._x, self._xext, self._libc
+        x.XOpenDisplay.restype = ctypes.c_void_p
+        x.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x.XRootWindow.restype = ctypes.c_ulong
+        x.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x.XDefaultVisual.restype = ctypes.c_void_p
+        x.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x.XFree.argtypes = [ctypes.c_void_p]
+        x.XSetErrorHandler.argtypes = [ctypes.c_void_p]
+        x.XSetErrorHandler.restype = ctypes.c_void_p
+        xe.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xe.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xe.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                       ctypes.c_char_p, ctypes.POINTER(_XShmSegmentInfo),
+                                       ctypes.c_uint, ctypes.c_uint]
+        xe.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xe.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xe.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+                                    ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        c.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        c.shmat.restype = ctypes.c_void_p
+        c.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        c.shmdt.argtypes = [ctypes.c_void_p]
+        c.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    def _alloc(self, w, h):
+        self._release()
+        shm = _XShmSegmentInfo()
+        img = self._xext.XShmCreateImage(self._dpy, self._visual, self._depth, self._ZPIXMAP,
+                                         None, ctypes.byref(shm), w, h)
+        if not img:
+            raise RuntimeError("XShmCreateImage başarısız")
+        bpp = img.contents.bits_per_pixel
+        if bpp != 32:
+            self._x.XFree(img)
+            raise RuntimeError(f"desteklenmeyen piksel biçimi ({bpp} bpp)")
+        size = img.contents.bytes_per_line * h
+        shm.shmid = self._libc.shmget(self._IPC_PRIVATE, size, self._IPC_CREAT | 0o600)
+        if shm.shmid < 0:
+            self._x.XFree(img)
+            raise OSError(ctypes.get_errno(), "shmget başarısız")
+        addr = self._libc.shmat(shm.shmid, None, 0)
+        if addr in (None, ctypes.c_void_p(-1).value):
+            self._libc.shmctl(shm.shmid, self._IPC_RMID, None)
+            self._x.XFree(img)
+            raise OSError(ctypes.get_errno(), "shmat başarısız")
+        shm.shmaddr = addr
+        shm.readOnly = 0
+        img.contents.data = addr
+        self._xext.XShmAttach(self._dpy, ctypes.byref(shm))
+        self._x.XSync(self._dpy, 0)
+        # iki taraf da bağlandı: segment son detach'ta otomatik silinsin
+        self._libc.shmctl(shm.shmid, self._IPC_RMID, None)
+        if self._take_error():
+            self._img, self._shm = img, shm
+            self._release()
+            raise RuntimeError("XShmAttach başarısız")
+
+        bpl = img.contents.bytes_per_line
+        raw = (ctypes.c_uint8 * size).from_address(addr)
+        self._view = np.frombuffer(raw, dtype=np.uint8).reshape(h, bpl // 4, 4)[:, :w]
+        self._img, self._shm, self._size = img, shm, (w, h)
+
+    def _take_error(self):
+        # bu bağlantıda X hatası olduysa bayrağı indirip True döner
+        if self._dpy in _x_errors:
+            _x_errors.discard(self._dpy)
+            return True
+        return False
+
+    def _release(self):
+        if self._img is not None:
+            self._xext.XShmDetach(self._dpy, ctypes.byref(self._shm))
+            self._x.XSync(self._dpy, 0)
+            self._x.XFree(self._img)
+            self._libc.shmdt(ctypes.c_void_p(self._shm.shmaddr))
+        self._img = self._shm = self._size = None
+        self._view = None
+
+    def grab(self, x, y, w, h):
+        # ekran dışına taşan istek X hatası verir; alanı sessizce kaydırmak başka
+        # bir bölgeyi yakalatacağından hata verilir
+        if x < 0 or y < 0 or x + w > self._screen_w or y + h > self._screen_h:
+            raise ValueError(f"yakalama alanı ({x}, {y}, {w}x{h}) ekranın dışına taşıyor"
+                             f" ({self._screen_w}x{self._screen_h})")
+        if self._size != (w, h):
+            self._alloc(w, h)
+        ok = self._xext.XShmGetImage(self._dpy, self._root, self._img, x, y, ctypes.c_ulong(-1).value)
+        if self._take_error() or not ok:
+            raise RuntimeError("XShmGetImage başarısız")
+        return cv2.cvtColor(self._view, cv2.COLOR_BGRA2BGR, dst=self._buffer(w, h))
+
+    def close(self):
+        if self._dpy:
+            self._release()
+            self._x.XCloseDisplay(self._dpy)
+            _x_errors.discard(self._dpy)
+            self._dpy = None
+            _release_error_handler(self._x)
+
+
+class ReplayCapture(CaptureBackend):
+    """Diskteki görüntüleri sırayla (döngüsel) döner; testler ve benchmark için.
+
+    Kare istenen boyuttaysa olduğu gibi, tam ekran görüntüsüyse (x, y, w, h) kırpılarak döner.
+    """
+    name = "replay"
+
+    def __init__(self, paths):
+        super().__init__()
+        if isinstance(paths, str):
+            paths = sorted(glob.glob(paths))
+        self.paths = list(paths)
+        if not self.paths:
+            raise RuntimeError("replay: görüntü yok")
+        self._frames = {}
+        self._pos = 0
+
+    def grab(self, x, y, w, h):
+        p = self.paths[self._pos % len(self.paths)]
+        self._pos += 1
+        frame = self._frames.get(p)
+        if frame is None:
+            frame = cv2.imread(p)
+            if frame is None:
+                raise RuntimeError(f"replay: okunamadı {p}")
+            self._frames[p] = frame
+        if frame.shape[:2] != (h, w):
+            frame = frame[y:y + h, x:x + w]
+        np.copyto(self._buffer(frame.shape[1], frame.shape[0]), frame)
+        return self._buf
+
+
+_AUTO_ORDER = (XShmCapture, MssCapture, PyAutoGuiCapture)
+_BY_NAME = {cls.name: cls for cls in _AUTO_ORDER}
+
+
+def create_backend(spec=None):
+    """spec: None/"auto", "xshm", "mss", "pyautogui" veya "replay:<glob>"."""
+    if spec and spec.startswith("replay:"):
+        return ReplayCapture(spec[len("replay:"):])
+    if spec and spec != "auto":
+        return _BY_NAME[spec]()
+    for cls in _AUTO_ORDER:
+        try:
+            return cls()
+        except Exception as e:
+            print(f"[i] ekran yakalama: {cls.name} kullanılamıyor ({e})")
+    raise RuntimeError("kullanılabilir ekran yakalama arka ucu yok")
@@ -0,0 +1,157 @@
+"""loading/ ve champion/ klasörlerini izleyen arka plan katalog servisi.
+
+Yeni skin ya da şampiyon görseli eklendiğinde uygulamayı yeniden başlatmak
+gerekmesin diye klasörler belirli aralıklarla yoklanır; yalnızca dosya adı,
+boyutu ve mtime'ı okunur (os.stat), görseller açılmaz. Değişiklik görülünce:
+
+  * loading/  -> splash deposu ve indeks yalnızca eklenen/silinen/değişen
+    görseller için güncellenir (RecognitionEngine.update_index). Yeni indeks
+    hazır olunca tek atamayla devreye girer; süren taramalar başladıkları
+    indeksle biter, beklemez.
+  * champion/ -> elle seçim listesi (champion_names) yenilenir.
+
+Kopyalaması süren dosyalar yarım işlenmesin diye bir değişiklik, imza iki
+yoklama boyunca aynı kaldığında uygulanır. Dosya sistemi olay API'leri ek
+bağımlılık getirdiği ve ağ sürücülerinde güvenilmez olduğu için yoklama
+kullanılır.
+
+    catalog = Catalog(engine)
+    catalog.start()
+    champion_names()      # güncel şampiyon listesi
+    catalog.stop()
+"""
+import glob, os, threading
+
+from splash_index import list_images
+
+_BASE = os.path.dirname(os.path.abspath(__file__))
+CHAMPION_DIR = os.path.join(_BASE, "champion")
+POLL_INTERVAL = 5.0   # sn
+
+_names = {}   # champion_dir -> (imza, isimler)
+_names_lock = threading.Lock()
+
+
+def _signature(paths):
+    # dosya adı -> (mtime_ns, boyut); okunamayan (silinmekte olan) dosyalar atlanır
+    sig = {}
+    for p in paths:
+        try:
+            s = os.stat(p)
+        except OSError:
+            continue
+        sig[os.path.basename(p)] = (s.st_mtime_ns, s.st_size)
+    return sig
+
+
+def _champion_files(champion_dir):
+    return glob.glob(os.path.join(champion_dir, "*.png"))
+
+
+def _diff(old, new):
+    added = sum(1 for n in new if n not in old)
+    removed = sum(1 for n in old if n not in new)
+    changed = sum(1 for n, st in new.items() if n in old and old[n] != st)
+    return added, removed, changed
+
+
+def _refresh_names(champion_dir, sig=None):
+    sig = _signature(_champion_files(champion_dir)) if sig is None else sig
+    names = tuple(sorted(os.path.splitext(n)[0] for n in sig))
+    with _names_lock:
+        _names[os.path.abspath(champion_dir)] = (sig, names)
+    return names
+
+
+def champion_names(champion_dir=CHAMPION_DIR):
+    """champion klasöründeki şampiyon adları (alfabetik); klasör her çağrıda listelenmez.
+
+    İzleyen bir Catalog varsa liste değişiklikte arka planda yenilenir.
+    """
+    hit = _names.get(os.path.abspath(champion_dir))
+    if hit is not None:
+        return hit[1]
+    if not os.path.isdir(champion_dir):
+        return ()
+    return _refresh_names(champion_dir)
+
+
+class Catalog:
+    """loading/ ve champion/ klasörlerini yoklayan daemon thread.
+
+    engine verilirse (RecognitionEngine) splash indeksi değişikliklerde
+    güncellenir; indeks henüz yüklenmediyse ilk tarama zaten güncel halini
+    kuracağından dokunulmaz.
+    """
+
+    def __init__(self, engine=None, loading_dir=None, champion_dir=CHAMPION_DIR,
+                 interval=POLL_INTERVAL):
+        self.engine = engine
+        self.loading_dir = loading_dir
+        self.champion_dir = champion_dir
+        self.interval = interval
+        self._seen = {}      # klasör -> son uygulanan imza
+        self._pending = {}   # klasör -> bir önceki yoklamada görülen (henüz uygulanmamış) imza
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sources(self):
+        out = []
+        if self.loading_dir and os.path.isdir(self.loading_dir):
+            out.append(("loading", self.loading_dir, list_images))
+        if os.path.isdir(self.champion_dir):
+            out.append(("champion", self.champion_dir, _champion_files))
+        return out
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        # ilk imzalar başlangıç durumudur; indeksi ilk tarama zaten eşitler
+        for _, path, lister in self._sources():
+            self._seen[path] = _signature(lister(path))
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"[-] katalog güncellenemedi: {e}")
+
+    def poll(self):
+        """Klasörleri bir kez yoklar; uygulanan değişikliklerin türlerini döner."""
+        applied = []
+        for kind, path, lister in self._sources():
+            sig = _signature(lister(path))
+            if sig == self._seen.get(path):
+                self._pending.pop(path, None)
+                continue
+            if sig != self._pending.get(path):
+                # dosyalar hâlâ yazılıyor olabilir: bir yoklama daha bekle
+                self._pending[path] = sig
+                continue
+            added, removed, changed = _diff(self._seen.get(path, {}), sig)
+            print(f"[i] katalog: {kind}/ {added} yeni, {removed} silinen, {changed} değişen görsel")
+            if kind == "loading":
+                self._update_index()
+            else:
+                _refresh_names(path, sig)
+            self._seen[path] = sig
+            self._pending.pop(path, None)
+            applied.append(kind)
+        return applied
+
+    def _update_index(self):
+        if self.engine is None or not self.engine.splash_index:
+            return
+        index = self.engine.update_index(self.loading_dir)
+        if index:
+            print(f"[✓] splash indeksi güncellendi: {len(index)} görsel")
@@ -1,17 +1,27 @@
 from PyQt5 import QtWidgets, QtCore, QtGui
 from spell_components import SpellButton
+from cooldown_scheduler import shared_scheduler
+from game_data import champion_data
+from catalog import champion_names
 import os
-import json
+
+DEFAULT_ULT_CD = 100  # şampiyon bilinmiyorsa sayaç bu değerden başlar
+
 
 class ChampionSelectWindow(QtWidgets.QWidget):
-    """Elle şampiyon seçme penceresi"""
+    """Elle şampiyon seçme penceresi.
+
+    suggestions: taramanın adayları [(isim, olasılık), ...]; listede önce
+    bunlar (olasılıkla birlikte), ardından kalan şampiyonlar alfabetik gelir.
+    """
     champion_selected = QtCore.pyqtSignal(str)
 
-    def __init__(self, champion_dir):
+    def __init__(self, champion_dir, suggestions=()):
         super().__init__()
         self.setWindowFlags(QtCore.Qt.Popup)
         self.setFixedSize(280, 320)
         self.champion_dir = champion_dir
+        self.suggestions = list(suggestions)
 
         layout = QtWidgets.QVBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)
@@ -29,25 +39,31 @@ class ChampionSelectWindow(QtWidgets.QWidget):
         self._load_all()
 
     def _load_all(self):
-        """champion klasöründeki tüm .png’leri yükler"""
-        self.all_names = []
-        for f in os.listdir(self.champion_dir):
-            if f.endswith(".png"):
-                name = os.path.splitext(f)[0]
-                self.all_names.append(name)
+        """champion klasöründeki tüm .png’leri yükler (liste katalog servisi tarafından güncel tutulur)"""
+        self.all_names = champion_names(self.champion_dir)
         self._populate(self.all_names)
 
     def _populate(self, names):
         self.list.clear()
-        for n in sorted(names):
+        names = set(names)
+        suggested = [(n, p) for n, p in self.suggestions if n in names]
+        for n, p in suggested:
+            item = QtWidgets.QListWidgetItem(f"{n}  (%{p * 100:.0f})")
+            item.setData(QtCore.Qt.UserRole, n)
+            item.setForeground(QtGui.QColor("#ff9900"))
+            self.list.addItem(item)
+        rest = names - {n for n, _ in suggested}
+        for n in sorted(rest):
             self.list.addItem(n)
+        if suggested:
+            self.list.setCurrentRow(0)
 
     def _filter(self, text):
         filtered = [n for n in self.all_names if text.lower() in n.lower()]
         self._populate(filtered)
 
     def _select(self, item):
-        name = item.text()
+        name = item.data(QtCore.Qt.UserRole) or item.text()
         self.champion_selected.emit(name)
         self.close()
 
@@ -61,7 +77,7 @@ class CharacterCard(QtWidgets.QFrame):
             print("champion klasörü bulunamadı.")
             return
 
-        win = ChampionSelectWindow(champion_dir)
+        win = ChampionSelectWindow(champion_dir, self.champion_candidates)
         win.champion_selected.connect(self._apply_manual_choice)
         pos = self.mapToGlobal(QtCore.QPoint(0, 0))
         win.move(pos.x() + self.width()//2 - win.width()//2,
@@ -71,10 +87,7 @@ class CharacterCard(QtWidgets.QFrame):
 
     def _apply_manual_choice(self, name):
         # karakter değişince varsa sayaç sıfırlansın
-        self.ult_timer.stop()
-        self.ult_timer_label.hide()
-        self.ult_timer_value = 100
-        self.ult_timer_running = False
+        self._stop_ult_timer()
 
         champion_dir = os.path.join(os.path.dirname(__file__), "champion")
         img_path = os.path.join(champion_dir, f"{name}.png")
@@ -90,6 +103,7 @@ class CharacterCard(QtWidgets.QFrame):
         self.setAttribute(QtCore.Qt.WA_TranslucentBackground)
         self.setStyleSheet("background: transparent; border: none;")
         self.mode = "edit"
+        self.champion_candidates = ()   # son taramanın adayları [(isim, olasılık), ...]
 
         outer = QtWidgets.QVBoxLayout(self)
         outer.setContentsMargins(0, 0, 0, 0)
@@ -113,6 +127,10 @@ class CharacterCard(QtWidgets.QFrame):
         self.spell1 = SpellButton("flash")
         self.spell2 = SpellButton("ignite")
 
+        # büyü hızı oyuncuya ait: bir butonda seçilince ikisine de uygulanır
+        for b in (self.spell1, self.spell2):
+            b.modifiers_changed.connect(self.set_summoner_modifiers)
+
         row.addWidget(self.spell1)
         row.addWidget(self.spell2)
         v.addLayout(row)
@@ -164,10 +182,6 @@ class CharacterCard(QtWidgets.QFrame):
         self.ult_timer_value = 100
         self.ult_timer_running = False
 
-        # Sayaç güncelleme için timer
-        self.ult_timer = QtCore.QTimer()
-        self.ult_timer.timeout.connect(self._update_ult_timer)
-
         # PP’ye tıklayınca sayaç başlasın/dursun
         self.icon.setFixedSize(100, 100)
         self.icon.setStyleSheet("background:#b32020; border:2px solid black; border-radius:0px;")
@@ -194,6 +208,10 @@ class CharacterCard(QtWidgets.QFrame):
         self._open = True
         self.arrow_btn.clicked.connect(self._toggle)
 
+    def set_champion_candidates(self, candidates):
+        """Taramanın top-k adayları; seçim penceresi bunlarla sıralı açılır."""
+        self.champion_candidates = tuple(candidates)
+
     def set_champion_icon(self, img_path):
         """Karakter PP’sini gösterir; yoksa kırmızı kare boş kalır."""
         if img_path and os.path.exists(img_path):
@@ -227,31 +245,37 @@ class CharacterCard(QtWidgets.QFrame):
         self.spell1.set_mode(mode)
         self.spell2.set_mode(mode)
         
+    def set_summoner_modifiers(self, modifiers):
+        """Oyuncunun büyü hızı kaynakları (game_data.SUMMONER_HASTE anahtarları)."""
+        self.spell1.set_modifiers(modifiers)
+        self.spell2.set_modifiers(modifiers)
+
     def set_editable(self, editable: bool):
         """Bu karakterin iki spelli de düzenleme moduna göre güncellenir."""
         self.spell1.set_editable(editable)
         self.spell2.set_editable(editable)
 
     def _on_ult_click(self, event):
-        self.ult_timer_label.raise_()
         """PP'ye tıklayınca ult cooldown sayacı başlat/durdur"""
         # Her tıklamada sayaç resetlenir ve baştan başlar
-        self.ult_timer.stop()                # varsa eski timer'ı durdur
-        self.ult_timer_value = 100           # yeniden başlat
-        self.ult_timer_label.setText(str(self.ult_timer_value))
+        self._start_ult_timer(DEFAULT_ULT_CD)
+
+    def _start_ult_timer(self, seconds):
+        # geri sayım ortak zamanlayıcıda; aynı kart için eski sayaç yenisiyle değişir
         self.ult_timer_label.show()
         self.ult_timer_label.raise_()
-        self.ult_timer.start(1000)
         self.ult_timer_running = True
+        shared_scheduler().start(self, seconds, self._update_ult_timer, self._stop_ult_timer)
 
-    def _update_ult_timer(self):
-        self.ult_timer_value -= 1
-        if self.ult_timer_value <= 0:
-            self.ult_timer.stop()
-            self.ult_timer_label.hide()
-            self.ult_timer_running = False
-            return
-        self.ult_timer_label.setText(str(self.ult_timer_value))
+    def _stop_ult_timer(self):
+        shared_scheduler().cancel(self)
+        self.ult_timer_label.hide()
+        self.ult_timer_value = 0
+        self.ult_timer_running = False
+
+    def _update_ult_timer(self, seconds):
+        self.ult_timer_value = seconds
+        self.ult_timer_label.setText(str(seconds))
 
     def _on_icon_pressed(self, event):
         """Mod durumuna göre davranış belirler."""
@@ -262,7 +286,7 @@ class CharacterCard(QtWidgets.QFrame):
                 print("champion klasörü bulunamadı.")
                 return
 
-            win = ChampionSelectWindow(champion_dir)
+            win = ChampionSelectWindow(champion_dir, self.champion_candidates)
             win.champion_selected.connect(self._apply_manual_choice)
             pos = self.mapToGlobal(QtCore.QPoint(0, 0))
             win.move(pos.x() + self.width() // 2 - win.width() // 2,
@@ -273,66 +297,15 @@ class CharacterCard(QtWidgets.QFrame):
             # use modunda her tıklamada sayaç yeniden başlasın
             self._reset_and_start_timer()
 
-    def _get_ultimate_cd(self, champ_name):
-        """Şampiyonun JSON dosyasını okuyup R büyüsünün ilk cooldown değerini döner."""
-        try:
-            path = os.path.join(os.path.dirname(__file__), "char_json", "champion_json", f"{champ_name}.json")
-            if not os.path.exists(path):
-                print(f"[!] JSON bulunamadı: {path}")
-                return 100  # fallback
-
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            spells = data["data"][champ_name]["spells"]
-            for s in spells:
-                if s["id"].endswith("R"):
-                    cd = s["cooldown"][0]
-                    return int(cd)
-            return 100
-        except Exception as e:
-            print(f"[JSON read error] {e}")
-            return 100
-
-    def _get_ultimate_cd_by_level(self, champ_name, level):
-        """Belirtilen ulti seviyesinin cooldown süresini döndürür."""
-        try:
-            path = os.path.join(os.path.dirname(__file__), "char_json", "champion_json", f"{champ_name}.json")
-            if not os.path.exists(path):
-                print(f"[!] JSON bulunamadı: {path}")
-                return None
-
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            spells = data["data"][champ_name]["spells"]
-            for s in spells:
-                if s["id"].endswith("R"):
-                    cds = s["cooldown"]
-                    idx = max(0, min(level - 1, len(cds) - 1))
-                    return cds[idx]
-            return None
-        except Exception as e:
-            print(f"[JSON read error] {e}")
-            return None
-
     def _reset_and_start_timer(self):
         """Her tıklamada sayaç sıfırlanır ve karakterin ulti süresinden başlar."""
-        self.ult_timer.stop()
-
         # Şampiyon ismini al
         champ_name = getattr(self, "current_champion", None)
-        if champ_name:
-            cd_value = self._get_ultimate_cd(champ_name)
-        else:
-            cd_value = 100  # eğer şampiyon atanmadıysa varsayılan
+        cd_value = champion_data().ult_cooldown(champ_name) if champ_name else None
+        if cd_value is None:
+            cd_value = DEFAULT_ULT_CD  # şampiyon atanmadıysa / verisi yoksa varsayılan
 
-        self.ult_timer_value = cd_value
-        self.ult_timer_label.setText(str(self.ult_timer_value))
-        self.ult_timer_label.show()
-        self.ult_timer_label.raise_()
-        self.ult_timer.start(1000)
-        self.ult_timer_running = True
+        self._start_ult_timer(cd_value)
 
     def _start_timer_for_level(self, level):
         """Seçilen ulti seviyesinin cooldown süresinden sayaç başlatır."""
@@ -341,15 +314,9 @@ class CharacterCard(QtWidgets.QFrame):
             print("[-] Önce bir şampiyon seçmelisin.")
             return
 
-        cd_value = self._get_ultimate_cd_by_level(champ_name, level)
+        cd_value = champion_data().ult_cooldown(champ_name, level)
         if cd_value is None:
-            cd_value = 100
+            cd_value = DEFAULT_ULT_CD
 
         # timer'ı sıfırla ve başlat
-        self.ult_timer.stop()
-        self.ult_timer_value = int(cd_value)
-        self.ult_timer_label.setText(str(self.ult_timer_value))
-        self.ult_timer_label.show()
-        self.ult_timer_label.raise_()
-        self.ult_timer.start(1000)
-        self.ult_timer_running = True
+        self._start_ult_timer(cd_value)
@@ -0,0 +1,363 @@
+"""Tanıma skorlarını kalibre edilmiş olasılığa çeviren Platt ölçekleme.
+
+Ham skorlar türler arasında karşılaştırılamıyor (splash: RANSAC + histogram,
+spell: ORB + LAB) ve kabul eşikleri elle seçilmişti (splash 75, spell eşiksiz).
+Burada her tür için etiketli setten (benchmark_labels.json)
+
+    p(doğru) = sigmoid(a * skor + b * fark + c),   fark = skor - en iyi diğer adayın skoru
+
+modeli ve bu olasılık için kabul eşiği uydurulur. Şampiyonlarda fark kullanılmaz
+(b = 0): MIN_INLIERS'ten sonra adayların çoğu tek kalıyor ve tek adayın farkı
+skorun kendisi olduğundan iki özellik aynı bilgiyi taşıyor. Eşik, etiketli sette top-1
+doğruluğu (etiketi None olan panelde "?" doğru sayılır) en yüksek yapan değerdir;
+şampiyonlarda doğruluk tarama anındaki gibi assign_unique'ten sonra ölçülür.
+Aynı set benchmark'ın gerileme kontrolünde de kullanıldığı için rapordaki cv_*
+değerleri görüntü bazında FOLDS katlı çapraz doğrulamadan gelir (model ve eşik
+dışarıda bırakılan görüntüler olmadan uydurulur); top1/brier set içi değerlerdir.
+Sonuç confidence.json'a yazılır; dosya yoksa eski sabit eşiklere denk varsayılan
+model kullanılır.
+
+    python confidence.py --fit
+    default_calibrator().annotate("spell", [("flash", 61.2), ("heal", 48.0)])
+"""
+import argparse, contextlib, json, math, os, sys, threading
+from dataclasses import dataclass, asdict, replace
+
+import numpy as np
+
+_BASE = os.path.dirname(os.path.abspath(__file__))
+CONFIDENCE_PATH = os.path.join(_BASE, "confidence.json")
+TOP_K = 4            # sonuçta taşınan aday sayısı (düzeltme pencereleri bunları önce gösterir)
+KINDS = ("champion", "spell", "spell_ncc")   # spell: ORB yöntemi, spell_ncc: NCC yöntemi
+MARGIN_KINDS = ("spell", "spell_ncc")        # fark özelliği uydurulan türler (şampiyon: yalnız skor)
+FOLDS = 5            # çapraz doğrulama katı (görüntü bazında)
+
+
+@dataclass(frozen=True)
+class Platt:
+    a: float            # skor katsayısı
+    b: float            # fark katsayısı
+    c: float            # sabit
+    threshold: float    # bu olasılığın altı "emin değil"
+
+    def prob(self, score, margin):
+        z = self.a * score + self.b * margin + self.c
+        # taşmasız sigmoid
+        return 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
+
+
+# confidence.json yokken: splash için eski 75 eşiği (p=0.5 tam 75'te), spell her zaman kabul
+DEFAULT_MODELS = {
+    "champion": Platt(a=0.2, b=0.0, c=-15.0, threshold=0.5),
+    "spell": Platt(a=0.1, b=0.0, c=0.0, threshold=0.0),
+    "spell_ncc": Platt(a=0.1, b=0.0, c=0.0, threshold=0.0),
+}
+
+
+def _margins(scores):
+    # her adayın skoru - kendisi dışındaki en iyi skor (tek aday: skorun kendisi)
+    s = np.asarray(scores, dtype=np.float64)
+    if len(s) < 2:
+        return s.copy()
+    order = np.argsort(-s)
+    other = np.full(len(s), s[order[0]])
+    other[order[0]] = s[order[1]]
+    return s - other
+
+
+class Calibrator:
+    """Tür başına Platt modeli; skorlu aday listesini olasılıklı top-k listesine çevirir."""
+
+    def __init__(self, models=None):
+        self.models = dict(DEFAULT_MODELS)
+        self.models.update(models or {})
+
+    @classmethod
+    def load(cls, path=CONFIDENCE_PATH):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            models = {k: Platt(**v) for k, v in data["models"].items() if k in KINDS}
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[!] {os.path.basename(path)} okunamadı, varsayılan eşikler kullanılıyor: {e}")
+            return cls()
+        return cls(models)
+
+    def save(self, path=CONFIDENCE_PATH, **meta):
+        data = dict(meta, models={k: asdict(m) for k, m in self.models.items()})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+    def threshold(self, kind):
+        return self.models[kind].threshold
+
+    def accepts(self, kind, prob):
+        return prob >= self.models[kind].threshold
+
+    def annotate(self, kind, candidates, k=TOP_K):
+        """[(isim, skor), ...] -> ((isim, skor, olasılık), ...) skora göre azalan, en fazla k."""
+        if not candidates:
+            return ()
+        model = self.models[kind]
+        scores = [sc for _, sc in candidates]
+        ranked = [(n, sc, round(model.prob(sc, m), 4))
+                  for (n, sc), m in zip(candidates, _margins(scores))]
+        ranked.sort(key=lambda c: -c[1])
+        return tuple(ranked[:k])
+
+
+_calibrator = None
+_lock = threading.Lock()
+
+
+def default_calibrator() -> Calibrator:
+    """Süreç çapındaki kalibratör; confidence.json ilk çağrıda bir kez okunur."""
+    global _calibrator
+    if _calibrator is None:
+        with _lock:
+            if _calibrator is None:
+                _calibrator = Calibrator.load()
+    return _calibrator
+
+
+# --- uydurma ---
+def fit_platt(x, y, iters=50, l2=1e-3):
+    """Lojistik regresyon (Newton) — Platt'ın yumuşatılmış hedefleriyle.
+
+    x: (N, d) özellikler ([skor, fark] ya da [skor]), y: (N,) 0/1 -> (katsayılar...,
+    sabit). Hedefler 1 -> (N+ + 1) / (N+ + 2), 0 -> 1 / (N- + 2); ayrılabilir küçük
+    setlerde katsayılar sonsuza kaçmaz.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n_pos, n_neg = y.sum(), len(y) - y.sum()
+    t = np.where(y > 0, (n_pos + 1.0) / (n_pos + 2.0), 1.0 / (n_neg + 2.0))
+    # ölçekli özelliklerde çöz, sonra ham skora geri çevir
+    mu, sd = x.mean(axis=0), x.std(axis=0)
+    sd[sd == 0] = 1.0
+    X = np.hstack([(x - mu) / sd, np.ones((len(x), 1))])
+    w = np.zeros(X.shape[1])
+    reg = np.full(X.shape[1], l2)
+    reg[-1] = 0.0
+    for _ in range(iters):
+        p = 1.0 / (1.0 + np.exp(-X @ w))
+        grad = X.T @ (p - t) + reg * w
+        hess = (X * (p * (1 - p))[:, None]).T @ X + np.diag(reg) + 1e-9 * np.eye(len(w))
+        step = np.linalg.solve(hess, grad)
+        w -= step
+        if np.abs(step).max() < 1e-8:
+            break
+    coef = w[:-1] / sd
+    c = w[-1] - (w[:-1] * mu / sd).sum()
+    return tuple(float(v) for v in coef) + (float(c),)
+
+
+def _intervals(probs):
+    # eşiğin (lo, hi] aralığında kararlar değişmez: hi ve üstü olasılıklar kabul
+    u = np.unique(np.clip(np.asarray(probs, dtype=np.float64), 0.0, 1.0))
+    u = u[u > 0.0]
+    return np.r_[0.0, u], np.r_[u, 1.0 + 1e-6]
+
+
+def _best_interval(lo, hi, acc):
+    # doğruluğu en yüksek aralıklardan en genişinin ortası (kabul/ret arası pay en büyük)
+    acc = np.asarray(acc, dtype=np.float64)
+    best = np.flatnonzero(np.isclose(acc, acc.max()))
+    k = best[np.argmax(hi[best] - lo[best])]
+    return float((lo[k] + min(hi[k], 1.0)) / 2.0), float(acc.max())
+
+
+def fit_threshold(probs, correct, negative):
+    """Top-1 doğruluğu en yüksek yapan olasılık eşiği.
+
+    correct: top-1 etiketle aynı; negative: etiket None (doğru cevap "?").
+    Eşit doğrulukta en geniş aralığın ortası seçilir (setteki hiçbir olasılığa
+    yapışık olmayan eşik).
+    """
+    probs = np.asarray(probs, dtype=np.float64)
+    correct = np.asarray(correct, dtype=bool)
+    negative = np.asarray(negative, dtype=bool)
+    lo, hi = _intervals(probs)
+    acc = [np.mean(np.where(probs >= t, correct, negative)) for t in hi]
+    return _best_interval(lo, hi, acc)
+
+
+def _samples(cases, engine, layouts=None):
+    """Etiketli panellerden tür başına (görüntü no, aday listesi, etiket) örnekleri."""
+    from benchmark import read_case, case_layout
+    from crops import extract_crops
+    from spell_icons import IconTemplates
+
+    ncc = IconTemplates(method="ncc")
+    out = {k: [] for k in KINDS}
+    for g, case in enumerate(cases):
+        panels = extract_crops(read_case(case), case_layout(case, layouts))
+        for i, p in enumerate(panels):
+            if i < len(case["champions"]):
+                m = engine.match_splash_ex(p["splash"]) if p["splash"].size else None
+                cands = [(n, sc) for n, sc, _ in m.candidates] if m else []
+                out["champion"].append((g, cands, case["champions"][i]))
+            if i < len(case["spells"]):
+                for j, crop in enumerate(p["spells"]):
+                    # etiketi None olan (loading ekranı olmayan karedeki) kırpıntılar
+                    # eşiğin reddetmesi gereken negatifler
+                    label = case["spells"][i][j]
+                    out["spell"].append((g, engine.icons.ranked(crop) if crop.size else [], label))
+                    out["spell_ncc"].append((g, ncc.ranked(crop) if crop.size else [], label))
+    return out
+
+
+def _features(samples):
+    # en iyi adayın [skor, fark] özelliği ve doğru çıkıp çıkmadığı
+    x, y = [], []
+    for _, cands, label in samples:
+        if cands:
+            s = [sc for _, sc in cands]
+            top = int(np.argmax(s))
+            x.append((s[top], _margins(s)[top]))
+            y.append(cands[top][0] == label)
+        else:
+            x.append((0.0, 0.0))
+            y.append(False)
+    return x, y
+
+
+def _decide(kind, model, samples, unique):
+    """Örnekleri bu modelle tarama anındaki gibi karara çevirir -> panel başına Match.
+
+    unique: şampiyonlar görüntü başına assign_unique ile birlikte atanır.
+    """
+    from recognizer import Match, SplashMatch, assign_unique
+
+    cal = Calibrator({kind: model})
+    cls = SplashMatch if kind == "champion" else Match
+    out = []
+    for _, cands, _ in samples:
+        ranked = cal.annotate(kind, cands)
+        if ranked:
+            name, score, p = ranked[0]
+            out.append(cls(name, score, p, cal.accepts(kind, p), ranked))
+        else:
+            out.append(cls())
+    if unique and kind == "champion":
+        groups = {}
+        for k, (g, _, _) in enumerate(samples):
+            groups.setdefault(g, []).append(k)
+        for ks in groups.values():
+            for k, m in zip(ks, assign_unique([out[k] for k in ks], calibrator=cal)):
+                out[k] = m
+    return out
+
+
+def _hits(matches, samples):
+    # benchmark.Scorer ile aynı: kabul edilmeyen tahmin "?", etiketi None olan panelde "?" doğru
+    return np.array([(m.name if m.confident else "?") == ("?" if label is None else label)
+                     for m, (_, _, label) in zip(matches, samples)], dtype=bool)
+
+
+def _fit_kind(kind, samples, unique):
+    """Tek tür için Platt modeli + eşik (örneklerin hepsiyle)."""
+    x, y = _features(samples)
+    if kind in MARGIN_KINDS:
+        a, b, c = fit_platt(x, y)
+    else:
+        (a, c), b = fit_platt([(sc,) for sc, _ in x], y), 0.0
+    model = Platt(round(a, 6), round(b, 6), round(c, 6), 0.0)
+    if not (unique and kind == "champion"):
+        probs = [model.prob(sc, m) for sc, m in x]
+        negative = [label is None for _, _, label in samples]
+        thr, _ = fit_threshold(probs, y, negative)
+        return replace(model, threshold=round(thr, 4))
+    # assign_unique eşiği geçen alt adayları da kullandığı için eşik adayları tüm
+    # adayların olasılıkları; her eşik için kararlar baştan verilir
+    cal = Calibrator({kind: model})
+    lo, hi = _intervals([p for _, cands, _ in samples for _, _, p in cal.annotate(kind, cands)])
+    acc = [_hits(_decide(kind, replace(model, threshold=float(t)), samples, True), samples).mean()
+           for t in hi]
+    thr, _ = _best_interval(lo, hi, acc)
+    return replace(model, threshold=round(thr, 4))
+
+
+def _scores(kind, model, samples, unique):
+    # (top-1 doğruluk, brier) — doğruluk karar sonrası, brier en iyi adayın olasılığıyla
+    x, y = _features(samples)
+    probs = np.array([model.prob(sc, m) for sc, m in x])
+    hits = _hits(_decide(kind, model, samples, unique), samples)
+    return hits, (probs - np.asarray(y, dtype=np.float64)) ** 2
+
+
+def fit(cases, engine, folds=FOLDS, layouts=None):
+    """Etiketli setten tür başına Platt modeli + eşik -> (Calibrator, rapor).
+
+    Şampiyon eşiği engine.unique_champions açıksa assign_unique sonrası doğrulukla
+    seçilir. Rapordaki cv_top1 / cv_brier görüntü bazında folds katlı çapraz
+    doğrulamadır: her kat, kendisi dışarıda uydurulan modelle değerlendirilir.
+    """
+    unique = engine.unique_champions
+    models, report = {}, {}
+    for kind, samples in _samples(cases, engine, layouts).items():
+        model = _fit_kind(kind, samples, unique)
+        hits, sq = _scores(kind, model, samples, unique)
+        groups = sorted({g for g, _, _ in samples})
+        cv_hits, cv_sq = [], []
+        for f in range(folds):
+            held = set(groups[f::folds])
+            train = [s for s in samples if s[0] not in held]
+            test = [s for s in samples if s[0] in held]
+            if not train or not test:
+                continue
+            h, q = _scores(kind, _fit_kind(kind, train, unique), test, unique)
+            cv_hits.append(h)
+            cv_sq.append(q)
+        models[kind] = model
+        report[kind] = {"samples": len(samples), "top1": round(float(hits.mean()), 4),
+                        "brier": round(float(sq.mean()), 4)}
+        if cv_hits:
+            report[kind].update(cv_top1=round(float(np.concatenate(cv_hits).mean()), 4),
+                                cv_brier=round(float(np.concatenate(cv_sq).mean()), 4))
+    return Calibrator(models), report
+
+
+def main(argv=None):
+    from benchmark import LABELS_PATH, load_cases
+    from calibration import CACHE_PATH as CALIBRATION_PATH
+    from recognizer import RecognitionEngine, find_loading_dir
+
+    ap = argparse.ArgumentParser(description="Güven kalibrasyonu (Platt) uydurma")
+    ap.add_argument("--fit", action="store_true", help="modeli etiketli setten uydur ve kaydet")
+    ap.add_argument("--labels", default=LABELS_PATH, help="etiket dosyası (json)")
+    ap.add_argument("--out", default=CONFIDENCE_PATH, help="model dosyası")
+    ap.add_argument("--folds", type=int, default=FOLDS, help="çapraz doğrulama katı (görüntü bazında)")
+    ap.add_argument("--layout", default=CALIBRATION_PATH,
+                    help='kalibrasyon dosyası ("fixed": sabit kırpma oranları)')
+    args = ap.parse_args(argv)
+    if not args.fit:
+        for kind, m in Calibrator.load(args.out).models.items():
+            print(f"{kind}: {m}")
+        return 0
+
+    with contextlib.redirect_stdout(sys.stderr):
+        engine = RecognitionEngine(workers=1)   # tarama ayarları (assign_unique açık)
+        if not engine.load_index(find_loading_dir()):
+            print("[-] splash indeksi yüklenemedi")
+            return 1
+        try:
+            cal, report = fit(load_cases(args.labels), engine, folds=max(2, args.folds),
+                              layouts=args.layout)
+        finally:
+            engine.shutdown()
+    cal.save(args.out, labels=os.path.relpath(args.labels, _BASE), report=report)
+    for kind, m in cal.models.items():
+        r = report[kind]
+        print(f"[✓] {kind}: a={m.a:.4f} b={m.b:.4f} c={m.c:.3f} eşik={m.threshold:.3f}"
+              f" ({r['samples']} örnek, top-1 {r['top1']}, brier {r['brier']};"
+              f" çapraz doğrulama top-1 {r.get('cv_top1')}, brier {r.get('cv_brier')})")
+    print(f"[✓] kaydedildi: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
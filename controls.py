@@ -34,6 +34,8 @@ class ModeSwitch(QtWidgets.QWidget):
 class ScanWithSide(QtWidgets.QWidget):
     """Sol altta: Tara + hemen yanında küçük yan menü 'Üstü tara' / 'Altı tara'."""
     sideChosen = QtCore.pyqtSignal(str)  # "top" / "bottom"
+    watchToggled = QtCore.pyqtSignal(bool)
+    calibrateRequested = QtCore.pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -67,10 +69,39 @@ class ScanWithSide(QtWidgets.QWidget):
         self.side_panel.setVisible(False)
         row.addWidget(self.side_panel)
 
+        # izleme modu: seçili alan sürekli izlenir, değişen paneller yeniden tanınır
+        self.btn_watch = QtWidgets.QPushButton("İzle")
+        self.btn_watch.setCheckable(True)
+        self.btn_watch.setFixedSize(70, 50)
+        self.btn_watch.setStyleSheet("""
+            QPushButton { background:#1e1e1e; color:white; font-weight:600; border-radius:8px; }
+            QPushButton:hover { background:#2b2b2b; }
+            QPushButton:checked { background:#1f5f2f; }
+        """)
+        row.addWidget(self.btn_watch)
+        self.btn_watch.toggled.connect(self.watchToggled.emit)
+
+        # kalibrasyon: yükleme ekranındaki kart/spell geometrisini bir kez bul
+        self.btn_calibrate = QtWidgets.QPushButton("Kalibre")
+        self.btn_calibrate.setFixedSize(80, 50)
+        self.btn_calibrate.setStyleSheet("""
+            QPushButton { background:#1e1e1e; color:white; font-weight:600; border-radius:8px; }
+            QPushButton:hover { background:#2b2b2b; }
+        """)
+        row.addWidget(self.btn_calibrate)
+        self.btn_calibrate.clicked.connect(self.calibrateRequested.emit)
+
         self.btn_scan.clicked.connect(self._toggle_side_panel)
         self.btn_top.clicked.connect(lambda: self._choose("top"))
         self.btn_bot.clicked.connect(lambda: self._choose("bottom"))
 
+    def set_progress(self, pct):
+        """Tarama sürerken butonda yüzde gösterir (tıklamak iptal eder); None = normal."""
+        if pct is None:
+            self.btn_scan.setText("Tara")
+        else:
+            self.btn_scan.setText(f"İptal %{pct}")
+
     def _toggle_side_panel(self):
         self.side_panel.setVisible(not self.side_panel.isVisible())
 
@@ -0,0 +1,104 @@
+"""Tüm geri sayımlar (büyücü büyüleri, ultiler) için ortak zamanlayıcı.
+
+Her sayaç kendi 1 sn'lik QTimer'ını tutup tam sayı azaltınca süreler duvar
+saatinden kayıyor; GUI thread'i (ör. tarama sırasında) bloklanınca kaçan
+tikler hiç telafi edilmiyordu. Burada her sayaç yalnızca time.monotonic()
+bitiş anını saklar; kalan süre her seferinde bu andan hesaplanır. Tek bir
+single-shot QTimer, gösterilen saniyesi değişecek ilk sayacın anına kurulur ve
+uyandığında yalnızca değeri değişen etiketleri günceller.
+
+    sched = shared_scheduler()
+    sched.start(label, 300, on_update=lambda s: label.setText(str(s)), on_done=label.hide)
+    sched.cancel(label)
+"""
+import math, time
+from PyQt5 import QtCore
+
+
+class _Countdown:
+    __slots__ = ("deadline", "shown", "on_update", "on_done")
+
+    def __init__(self, deadline, on_update, on_done):
+        self.deadline = deadline
+        self.shown = None          # son gösterilen saniye
+        self.on_update = on_update
+        self.on_done = on_done
+
+
+class CooldownScheduler(QtCore.QObject):
+    """Monotonik bitiş anlarına göre çalışan, tek QTimer'lı geri sayım yöneticisi.
+
+    Sayaçlar bir anahtarla (genelde sahibi olan widget) tutulur; aynı anahtarla
+    yeniden start() eski sayacı değiştirir. on_update(kalan_sn) yalnızca
+    gösterilen tam saniye değiştiğinde, on_done() süre bitince bir kez çağrılır.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items = {}
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self, key, seconds, on_update, on_done=None):
+        cd = _Countdown(time.monotonic() + float(seconds), on_update, on_done)
+        self._items[key] = cd
+        cd.shown = max(0, math.ceil(seconds))
+        on_update(cd.shown)
+        self._reschedule()
+
+    def cancel(self, key):
+        """Sayacı durdurur; on_done çağrılmaz."""
+        if self._items.pop(key, None) is not None and not self._items:
+            self._timer.stop()
+
+    def remaining(self, key):
+        """Kalan süre (sn, kesirli); sayaç yoksa 0."""
+        cd = self._items.get(key)
+        return max(0.0, cd.deadline - time.monotonic()) if cd else 0.0
+
+    def is_running(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def _tick(self):
+        now = time.monotonic()
+        for key, cd in list(self._items.items()):
+            left = cd.deadline - now
+            if left <= 0:
+                # callback içinde aynı anahtarla yeniden başlatılabilir
+                if self._items.get(key) is cd:
+                    del self._items[key]
+                if cd.on_done:
+                    cd.on_done()
+                continue
+            shown = math.ceil(left)
+            if shown != cd.shown:
+                cd.shown = shown
+                cd.on_update(shown)
+        self._reschedule()
+
+    def _reschedule(self):
+        if not self._items:
+            self._timer.stop()
+            return
+        now = time.monotonic()
+        # gösterilen değer (shown) kalan süre shown - 1'e indiğinde değişir
+        wake = min(cd.deadline - (cd.shown - 1) - now if cd.shown else cd.deadline - now
+                   for cd in self._items.values())
+        # +1 ms: tam sınırda uyanıp aynı değeri tekrar hesaplamasın
+        self._timer.start(max(0, int(wake * 1000.0)) + 1)
+
+
+_shared = None
+
+
+def shared_scheduler():
+    """Uygulama çapındaki tek zamanlayıcı (QApplication oluşturulduktan sonra çağrılmalı)."""
+    global _shared
+    if _shared is None:
+        _shared = CooldownScheduler(QtCore.QCoreApplication.instance())
+    return _shared
@@ -0,0 +1,121 @@
+import os
+import cv2
+import numpy as np
+
+from splash_index import popcount64
+
+# --- panel geometrisi (seçim kutusuna göre oranlar) ---
+NUM_PANELS = 5
+CARD_WIDTH_RATIO = 0.176
+CARD_GAP_RATIO   = 0.030
+SPELL_ROI_Y0, SPELL_ROI_Y1 = 0.82, 0.88
+
+# Şampiyon splash bölgesi (üst kısım)
+SPLASH_ROI_Y0, SPLASH_ROI_Y1 = 0.025, 0.79
+
+SPELL_BOXES = [
+    (0.680, 0.790),
+    (0.810, 0.930),
+]
+
+
+def extract_crops(img_bgr, layout=None):
+    """Ekran görüntüsünü 5 panele böler; kırpımlar diske yazılmaz, numpy view olarak döner.
+
+    layout (calibration.CardLayout, görüntü koordinatlarında) verilirse kart ve
+    spell kutuları ondan alınır; yoksa seçim kutusuna göre sabit oranlar kullanılır.
+
+    Dönen liste panel başına: {"x0", "x1", "spell_y": (y0, y1), "spell_x": [(x0, x1), ...],
+    "splash": view, "spells": [view, view]}
+    """
+    img = img_bgr if len(img_bgr.shape) == 3 else cv2.cvtColor(img_bgr, cv2.COLOR_GRAY2BGR)
+    if layout is not None:
+        return _extract_layout(img, layout)
+    H, W = img.shape[:2]
+    panels = []
+    x = 0
+    for i in range(NUM_PANELS):
+        x0 = int(W * x)
+        x1 = int(W * (x + CARD_WIDTH_RATIO))
+        panel = img[:, x0:x1]
+        pH, pW = panel.shape[:2]
+        y0, y1 = int(pH * SPELL_ROI_Y0), int(pH * SPELL_ROI_Y1)
+        roi = panel[y0:y1, :]
+        spells, spell_x = [], []
+        for fx0, fx1 in SPELL_BOXES:
+            sx0, sx1 = max(0, int(pW * fx0)), min(pW, int(pW * fx1))
+            spells.append(roi[:, sx0:sx1])
+            spell_x.append((x0 + sx0, x0 + sx1))
+
+        # --- Champion Splash Art kırp ---
+        y0_s, y1_s = int(pH * SPLASH_ROI_Y0), int(pH * SPLASH_ROI_Y1)
+        panels.append({
+            "x0": x0, "x1": x1, "spell_y": (y0, y1), "spell_x": spell_x,
+            "splash": panel[y0_s:y1_s, :],
+            "spells": spells,
+        })
+        x += CARD_WIDTH_RATIO + CARD_GAP_RATIO
+    return panels
+
+
+def _extract_layout(img, layout):
+    # kalibre edilmiş geometri: kart dikdörtgenleri + karta göre spell kutuları
+    H, W = img.shape[:2]
+    panels = []
+    for cx, cy, cw, ch in layout.cards[:NUM_PANELS]:
+        x0, x1 = max(0, cx), min(W, cx + cw)
+        card_y0 = max(0, cy)
+        panel = img[card_y0:min(H, cy + ch), x0:x1]
+        pH, pW = panel.shape[:2]
+        spells, spell_x, spell_y = [], [], None
+        for fx0, fx1, fy0, fy1 in layout.spell_boxes:
+            sx0, sx1 = max(0, int(pW * fx0)), min(pW, int(pW * fx1))
+            sy0, sy1 = max(0, int(pH * fy0)), min(pH, int(pH * fy1))
+            spells.append(panel[sy0:sy1, sx0:sx1])
+            spell_x.append((x0 + sx0, x0 + sx1))
+            spell_y = spell_y or (card_y0 + sy0, card_y0 + sy1)
+        y0_s, y1_s = int(pH * SPLASH_ROI_Y0), int(pH * SPLASH_ROI_Y1)
+        panels.append({
+            "x0": x0, "x1": x1, "spell_y": spell_y or (card_y0, card_y0),
+            "spell_x": spell_x,
+            "splash": panel[y0_s:y1_s, :],
+            "spells": spells,
+        })
+    return panels
+
+
+def dump_crops(img_bgr, panels, out_dir):
+    """Debug çıktısı: kırpımları ve kutuları çizilmiş tam görüntüyü out_dir'e yazar."""
+    os.makedirs(out_dir, exist_ok=True)
+    debug_img = img_bgr.copy()
+    H = debug_img.shape[0]
+    for i, p in enumerate(panels, start=1):
+        x0, x1 = p["x0"], p["x1"]
+        y0, y1 = p["spell_y"]
+        cv2.rectangle(debug_img, (x0, 0), (x1, H), (0, 255, 0), 2)
+        cv2.rectangle(debug_img, (x0, y0), (x1, y1), (255, 0, 0), 2)
+        for s_idx, (abs_x0, abs_x1) in enumerate(p["spell_x"], start=1):
+            cv2.rectangle(debug_img, (abs_x0, y0), (abs_x1, y1), (0, 165, 255), 2)
+            cv2.imwrite(os.path.join(out_dir, f"char{i}_spell{s_idx}.png"), p["spells"][s_idx - 1])
+        cv2.imwrite(os.path.join(out_dir, f"char{i}_splash.png"), p["splash"])
+    debug_path = os.path.join(out_dir, "debug_full.png")
+    cv2.imwrite(debug_path, debug_img)
+    print(f"[✓] Debug görsel kaydedildi: {debug_path}")
+
+
+def _ahash(crop):
+    # 8x8 ortalama hash -> tek uint64
+    if crop.size == 0:
+        return np.uint64(0)
+    g = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+    small = cv2.resize(g, (8, 8), interpolation=cv2.INTER_AREA)
+    return np.packbits(small > small.mean()).view(">u8").astype(np.uint64)[0]
+
+
+def panel_signature(panel):
+    """Panelin ucuz değişim imzası: splash + 2 spell için birer 64-bit hash."""
+    return np.array([_ahash(panel["splash"])] + [_ahash(c) for c in panel["spells"]], dtype=np.uint64)
+
+
+def signature_changed(a, b, max_bits):
+    return int(popcount64(np.bitwise_xor(a, b)).max()) > max_bits
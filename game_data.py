@@ -0,0 +1,261 @@
+"""Şampiyon büyü verisi (cooldown, maliyet, menzil) için süreç çapında ortak depo.
+
+Data Dragon dosyaları (char_json/championFull.json, champion_json/*.json) büyük
+ve tıklama anında okunamayacak kadar yavaş. Gerekli alanlar bir kez
+char_json/champion_spells.json adlı küçük bir tabloya çıkarılır; bu tablo ilk
+kullanımda tek sefer okunur ve sonraki tüm sorgular bellekteki sözlükten O(1)
+yanıtlanır. Tablo, üretildiği kaynağın SHA-1 özetini taşır; kaynak değiştiyse
+(ya da TABLE_VERSION farklıysa) tablo otomatik yeniden üretilir. Dosya tarihleri
+kullanılmaz: git checkout mtime'ları sıfırlar.
+
+    from game_data import champion_data
+    champion_data().ult_cooldown("Ahri", rank=2)     # 120
+    champion_data().spell("Ahri", "Q").cost          # (55, 65, 75, 85, 95)
+
+Büyücü büyüleri (char_json/summoner.json, ~20 KB) doğrudan okunur; bekleme
+süreleri büyü hızı (summoner haste) ile oyundaki formüle göre kısaltılır:
+
+    summoner_cooldown("flash", haste=SUMMONER_HASTE["cosmic_insight"])   # 254.24… (sayaç 255'ten başlar)
+
+Tablo elle de üretilebilir:
+
+    python game_data.py
+"""
+import hashlib, json, os, sys, threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+_BASE = os.path.dirname(os.path.abspath(__file__))
+SOURCE_PATH = os.path.join(_BASE, "char_json", "championFull.json")
+TABLE_PATH = os.path.join(_BASE, "char_json", "champion_spells.json")
+SUMMONER_PATH = os.path.join(_BASE, "char_json", "summoner.json")
+TABLE_VERSION = 2
+
+SPELL_KEYS = ("Q", "W", "E", "R")
+
+# arayüzdeki büyü adı -> Data Dragon anahtarı
+SUMMONER_IDS = {
+    "barrier": "SummonerBarrier", "cleanse": "SummonerBoost", "exhaust": "SummonerExhaust",
+    "flash": "SummonerFlash", "ghost": "SummonerHaste", "heal": "SummonerHeal",
+    "ignite": "SummonerDot", "smite": "SummonerSmite", "teleport": "SummonerTeleport",
+}
+DEFAULT_SUMMONER_CD = 60
+
+# oyuncu başına büyücü büyüsü hızı kaynakları (toplanır)
+SUMMONER_HASTE = {
+    "cosmic_insight": 18,   # Kozmik Kavrayış rünü
+    "ionian_boots": 10,     # İonya Botları
+}
+
+
+@dataclass(frozen=True)
+class Spell:
+    """Tek bir yeteneğin seviye (rank) başına değerleri."""
+    id: str
+    name: str
+    maxrank: int
+    cooldown: Tuple[float, ...]
+    cost: Tuple[float, ...]
+    range: Tuple[float, ...]
+
+    def cooldown_at(self, rank=1):
+        """rank 1'den başlar; aralık dışı değerler ilk/son seviyeye sıkıştırılır."""
+        if not self.cooldown:
+            return None
+        return self.cooldown[max(0, min(int(rank) - 1, len(self.cooldown) - 1))]
+
+
+@dataclass(frozen=True)
+class Champion:
+    id: str          # Data Dragon anahtarı ("MonkeyKing"); champion/*.png adlarıyla aynı
+    name: str        # görünen ad ("Wukong")
+    partype: str     # kaynak türü ("Mana", "Energy", ...)
+    spells: Dict[str, Spell]
+
+
+def _num(v):
+    # Data Dragon tam sayıları float olarak da yazabiliyor (10.0)
+    return int(v) if float(v).is_integer() else float(v)
+
+
+def _digest(raw):
+    return hashlib.sha1(raw).hexdigest()
+
+
+def source_digest(source=SOURCE_PATH):
+    """Kaynak dosyanın SHA-1 özeti (tablonun güncel olup olmadığı buna bakılarak anlaşılır)."""
+    with open(source, "rb") as f:
+        return _digest(f.read())
+
+
+def extract_table(source=SOURCE_PATH):
+    """Data Dragon championFull.json'dan kompakt büyü tablosunu (dict) çıkarır."""
+    with open(source, "rb") as f:
+        raw = f.read()
+    full = json.loads(raw.decode("utf-8"))
+    champions = {}
+    for cid, c in sorted(full["data"].items()):
+        spells = {}
+        for key, s in zip(SPELL_KEYS, c.get("spells", [])):
+            spells[key] = {"id": s["id"], "name": s["name"], "maxrank": int(s.get("maxrank", 0)),
+                           "cooldown": [_num(v) for v in s.get("cooldown") or []],
+                           "cost": [_num(v) for v in s.get("cost") or []],
+                           "range": [_num(v) for v in s.get("range") or []]}
+        champions[cid] = {"name": c.get("name", cid), "partype": c.get("partype", ""),
+                          "spells": spells}
+    return {"table_version": TABLE_VERSION, "ddragon_version": full.get("version"),
+            "source_sha1": _digest(raw), "champions": champions}
+
+
+def write_table(table, path=TABLE_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+class ChampionData:
+    """Bellekteki şampiyon/büyü tablosu. Sorgular diske dokunmaz."""
+
+    def __init__(self, table):
+        self.version = table.get("ddragon_version")
+        self._champs: Dict[str, Champion] = {}
+        for cid, c in table["champions"].items():
+            spells = {k: Spell(s["id"], s["name"], s["maxrank"], tuple(s["cooldown"]),
+                               tuple(s["cost"]), tuple(s["range"]))
+                      for k, s in c["spells"].items()}
+            self._champs[cid] = Champion(cid, c["name"], c["partype"], spells)
+        # loading/ dosyaları bazı adları farklı yazıyor (FiddleSticks); büyük/küçük harf duyarsız
+        self._alias = {cid.lower(): cid for cid in self._champs}
+        self._alias.update({c.name.lower(): cid for cid, c in self._champs.items()})
+        self._names = sorted(self._champs)
+
+    @classmethod
+    def load(cls, path=TABLE_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self._champs)
+
+    def __contains__(self, champ):
+        return self.champion(champ) is not None
+
+    def names(self) -> List[str]:
+        """Tüm şampiyon anahtarları, alfabetik."""
+        return list(self._names)
+
+    def champion(self, champ) -> Optional[Champion]:
+        if not champ:
+            return None
+        c = self._champs.get(champ)
+        if c is None:
+            cid = self._alias.get(champ.lower())
+            c = self._champs.get(cid) if cid else None
+        return c
+
+    def spell(self, champ, key) -> Optional[Spell]:
+        """key: "Q", "W", "E" veya "R"."""
+        c = self.champion(champ)
+        return c.spells.get(key.upper()) if c else None
+
+    def cooldown(self, champ, key, rank=1):
+        s = self.spell(champ, key)
+        return s.cooldown_at(rank) if s else None
+
+    def ult_cooldown(self, champ, rank=1):
+        """Ultinin verilen seviyedeki bekleme süresi (sn); bilinmiyorsa None."""
+        return self.cooldown(champ, "R", rank)
+
+
+_data = None
+_lock = threading.Lock()
+
+
+def _table_stale(table, source_path):
+    # kaynak yoksa eldeki tablo kullanılır; varsa içerik özeti tutmalı
+    if table.get("table_version") != TABLE_VERSION:
+        return True
+    return os.path.exists(source_path) and table.get("source_sha1") != source_digest(source_path)
+
+
+def _load(table_path=TABLE_PATH, source_path=SOURCE_PATH):
+    table = None
+    if os.path.exists(table_path):
+        try:
+            with open(table_path, "r", encoding="utf-8") as f:
+                table = json.load(f)
+            if not _table_stale(table, source_path):
+                return ChampionData(table)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[!] Büyü tablosu okunamadı, yeniden çıkarılıyor: {e}")
+            table = None
+    if not os.path.exists(source_path):
+        print(f"[-] Şampiyon verisi bulunamadı: {source_path}")
+        return ChampionData({"champions": {}})
+    print("[i] Şampiyon büyü tablosu çıkarılıyor...")
+    table = extract_table(source_path)
+    try:
+        write_table(table, table_path)
+    except OSError as e:
+        print(f"[!] Büyü tablosu yazılamadı: {e}")
+    return ChampionData(table)
+
+
+def champion_data() -> ChampionData:
+    """Süreç çapındaki tek ChampionData örneği; ilk çağrıda yüklenir."""
+    global _data
+    if _data is None:
+        with _lock:
+            if _data is None:
+                _data = _load()
+                print(f"[+] Şampiyon verisi hazır: {len(_data)} şampiyon (v{_data.version})")
+    return _data
+
+
+_summoners = None
+
+
+def summoner_cooldowns() -> Dict[str, float]:
+    """Büyü adı -> temel bekleme süresi (sn); summoner.json ilk çağrıda bir kez okunur."""
+    global _summoners
+    if _summoners is None:
+        with _lock:
+            if _summoners is None:
+                try:
+                    with open(SUMMONER_PATH, "r", encoding="utf-8") as f:
+                        data = json.load(f)["data"]
+                    _summoners = {name: _num(data[sid]["cooldown"][0])
+                                  for name, sid in SUMMONER_IDS.items() if sid in data}
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"[!] summoner.json okunamadı: {e}")
+                    _summoners = {}
+    return _summoners
+
+
+def summoner_haste(modifiers) -> int:
+    """SUMMONER_HASTE anahtarlarından oluşan kümenin toplam büyü hızı."""
+    return sum(SUMMONER_HASTE.get(m, 0) for m in modifiers)
+
+
+def summoner_cooldown(spell, haste=0):
+    """Büyü hızı uygulanmış bekleme süresi (sn): temel * 100 / (100 + hız)."""
+    base = summoner_cooldowns().get(spell, DEFAULT_SUMMONER_CD)
+    return base * 100.0 / (100.0 + max(0, haste))
+
+
+def _preload():
+    champion_data()
+    summoner_cooldowns()
+
+
+def preload():
+    """Tabloları arka planda yükler; ilk tıklama yükleme beklemesin diye açılışta çağrılır."""
+    threading.Thread(target=_preload, name="game-data-preload", daemon=True).start()
+
+
+if __name__ == "__main__":
+    table = extract_table(sys.argv[1] if len(sys.argv) > 1 else SOURCE_PATH)
+    write_table(table)
+    print(f"[✓] {len(table['champions'])} şampiyon -> {TABLE_PATH}")
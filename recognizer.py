@@ -0,0 +1,506 @@
+"""Qt'siz tanıma motoru: görüntü alır, tipli sonuç döner.
+
+PyQt5 / pyautogui import etmez; işçi süreçleri, benchmark ve CLI doğrudan
+kullanabilir. İndeks yaşam döngüsü açıktır:
+
+    engine = RecognitionEngine()
+    engine.load_index()        # diskteki indeksi aç, değişen görselleri işle
+    engine.warm()              # ikon şablonları + thread başına ORB, sayfaları ısıt
+    result = engine.recognize(img_bgr)
+    result.panels[0].champion_name, result.panels[0].spells[0].name
+"""
+import os, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, asdict, replace
+from typing import List, Tuple
+import cv2
+import numpy as np
+
+from confidence import default_calibrator
+from crops import extract_crops
+from spell_icons import IconTemplates, DEFAULT_SPELL_MATCHER
+from splash_index import SplashIndex, INDEX_PATH, ORB_FEATURES, prep_for_match, hist_hsv
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 4)
+MIN_VOTES = 4             # kısa listeye girmek için gereken en az oy (yaklaşık arama)
+MIN_GOOD = 8              # RANSAC için gereken en az kesin (knn + ratio) eşleşme
+RATIO = 0.75              # Lowe ratio testi
+# inlier oranı birkaç noktada yanıltıcı (11 eşleşmenin 10'u tutabiliyor): bundan
+# az inlier'lı aday skorlanmaz. Etiketli sette doğru skinler >150, yanlışlar <=10.
+MIN_INLIERS = 20
+# iki seviyeli aday seçimi: önce şampiyon (skinlerinin en yüksek oyu), sonra
+# seçilen şampiyonların en çok oy alan skinleri -> RANSAC işi en fazla 4 x 3
+CHAMPION_SHORTLIST = 4
+SKINS_PER_CHAMPION = 3
+# Erken çıkış: en iyi skor bu eşiği geçtiyse ve oyu sıradaki adayın oyunun
+# EARLY_EXIT_MARGIN katıysa kalan adaylar doğrulanmaz (None = kapalı)
+EARLY_EXIT_SCORE = 90.0
+EARLY_EXIT_MARGIN = 2.0
+# Takımda aynı şampiyon iki kez olamaz; ancak bu skorun üstündeki eşleşmeler
+# gerçek kopya sayılır (botlu özel oyunlarda aynı şampiyon iki kez seçilebiliyor)
+UNIQUE_EXEMPT_SCORE = 90.0
+
+_BASE = os.path.dirname(__file__)
+LOADING_DIR_CANDIDATES = [
+    os.path.join(_BASE, "assets", "loading"),
+    os.path.join(_BASE, "loading"),
+]
+
+
+@dataclass(frozen=True)
+class Match:
+    name: str = "?"
+    score: float = -1.0
+    confidence: float = 0.0   # kalibre edilmiş doğruluk olasılığı (confidence.py)
+    confident: bool = False   # olasılık türün kabul eşiğini geçti; geçmeyen şampiyon "?" sayılır
+    candidates: Tuple[Tuple[str, float, float], ...] = ()   # (isim, skor, olasılık) top-k, skora göre azalan
+
+    @property
+    def found(self):
+        return self.name != "?"
+
+
+@dataclass(frozen=True)
+class SplashMatch(Match):
+    evaluated: int = 0      # RANSAC ile doğrulanan aday sayısı
+    shortlisted: int = 0    # oy eşiğini geçen aday sayısı
+
+
+@dataclass(frozen=True)
+class PanelResult:
+    index: int
+    champion: SplashMatch = SplashMatch()
+    spells: Tuple[Match, ...] = (Match(), Match())
+
+    @property
+    def champion_name(self):
+        # overlay'deki eşik: kalibre edilmiş olasılığı düşük splash "?" sayılır
+        return self.champion.name if self.champion.confident else "?"
+
+
+@dataclass
+class ScanResult:
+    panels: List[PanelResult] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    def to_dict(self):
+        return {
+            "champions": [{"name": p.champion_name, "score": p.champion.score,
+                           "confidence": p.champion.confidence, "evaluated": p.champion.evaluated,
+                           "candidates": [list(c) for c in p.champion.candidates]}
+                          for p in self.panels],
+            "spells": [[asdict(m) for m in p.spells] for p in self.panels],
+            "ms": round(self.elapsed_ms, 1),
+        }
+
+
+def _score(x):
+    return round(float(x), 1)
+
+
+def assign_unique(matches, fixed=(), exempt_score=UNIQUE_EXEMPT_SCORE, calibrator=None):
+    """Paneller arasında şampiyonları birlikte atar: takımda aynı şampiyon bir kez.
+
+    matches: panel başına SplashMatch. fixed: değiştirilmeyecek panel numaraları
+    (ör. izleme modunda bu turda taranmayan paneller). exempt_score üstündeki
+    eşleşmeler de sabittir. Kalan paneller için her panelin aday listesinden
+    (olasılığı kabul eşiğini geçen adaylar + "?") toplam skoru en yüksek, sabit
+    panellerle ve birbiriyle çakışmayan atama seçilir. Değişen paneller yeni
+    SplashMatch ile döner.
+    """
+    calibrator = calibrator or default_calibrator()
+    out = list(matches)
+    locked = [i for i, m in enumerate(out)
+              if i in fixed or (m.found and m.score >= exempt_score)]
+    taken = {out[i].name for i in locked if out[i].confident}
+    free = [i for i in range(len(out)) if i not in locked and out[i].candidates]
+    if not free:
+        return out
+
+    options = []
+    for i in free:
+        opts = [(n, sc, p) for n, sc, p in out[i].candidates
+                if calibrator.accepts("champion", p) and n not in taken]
+        options.append(opts + [("?", 0.0, 0.0)])
+
+    best = (-1.0, None)
+
+    def search(k, used, total, chosen):
+        nonlocal best
+        if k == len(free):
+            if total > best[0]:
+                best = (total, list(chosen))
+            return
+        for name, sc, p in options[k]:
+            if name != "?" and name in used:
+                continue
+            chosen.append((name, sc, p))
+            search(k + 1, used | {name} if name != "?" else used, total + sc, chosen)
+            chosen.pop()
+
+    search(0, frozenset(), 0.0, [])   # panel başına en fazla CHAMPION_SHORTLIST + 1 seçenek
+    for i, (name, sc, p) in zip(free, best[1]):
+        m = out[i]
+        if name == m.name:
+            continue
+        if name == "?":
+            # yeni atamada bu panele uygun şampiyon kalmadı: aday listesi düzeltme için kalır
+            out[i] = replace(m, confident=False)
+        else:
+            out[i] = replace(m, name=name, score=sc, confidence=p, confident=True)
+    return out
+
+
+def find_loading_dir():
+    for p in LOADING_DIR_CANDIDATES:
+        if os.path.isdir(p):
+            return p
+    print("[-] 'loading' klasörü bulunamadı. Şu yollar denendi:")
+    for c in LOADING_DIR_CANDIDATES: print("   ", c)
+    return None
+
+
+class RecognitionEngine:
+    """Panel başına splash ve spell eşleştirmelerini iş parçacığı havuzunda çalıştırır.
+
+    OpenCV (ORB, knnMatch, findHomography) GIL'i bıraktığı için 5 splash + 10 spell
+    işi paralel ilerler. Sonuçlar callback ile bildirilir; callback'ler işçi
+    thread'inde çağrılır.
+    """
+
+    def __init__(self, icon_templates=None, workers=DEFAULT_WORKERS,
+                 early_exit_score=EARLY_EXIT_SCORE, early_exit_margin=EARLY_EXIT_MARGIN,
+                 roster=None, unique_champions=True, calibrator=None,
+                 spell_matcher=DEFAULT_SPELL_MATCHER):
+        self.icons = icon_templates or IconTemplates(method=spell_matcher)
+        # skor ölçeği yönteme bağlı: her yöntemin kendi kalibrasyon modeli var
+        self.spell_kind = "spell" if self.icons.method == "orb" else f"spell_{self.icons.method}"
+        self.splash_index = None
+        self.workers = max(1, int(workers))
+        self.early_exit_score = early_exit_score
+        self.early_exit_margin = early_exit_margin
+        self.roster = roster                    # None = tüm şampiyonlar, yoksa isim listesi
+        self.unique_champions = unique_champions
+        self.calibrator = calibrator or default_calibrator()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="recog")
+        self._local = threading.local()  # ORB thread'ler arasında paylaşılmaz
+        self._index_lock = threading.Lock()  # indeks dosyasını aynı anda tek yazan güncellesin
+
+    # --- indeks yaşam döngüsü ---
+    def build_index(self, loading_dir=None, index_path=INDEX_PATH):
+        """İndeksi baştan oluşturur (önbellek yok sayılır)."""
+        loading_dir = loading_dir or find_loading_dir()
+        with self._index_lock:
+            self.splash_index = SplashIndex.build(loading_dir, index_path) if loading_dir else None
+        return self.splash_index
+
+    def load_index(self, loading_dir=None, index_path=INDEX_PATH, update=True):
+        """Diskteki indeksi açar.
+
+        update=True ise loading klasörü taranır, yalnızca yeni/değişen görseller
+        işlenir; klasör bulunamazsa daha önce hazırlanmış splash deposu kullanılır.
+        update=False klasöre bakmadan dosyayı olduğu gibi açar (işçi süreçleri
+        için; indeksi ana süreç güncel tutar).
+        """
+        if not update:
+            self.splash_index = SplashIndex.load(index_path)
+            return self.splash_index
+        # klasör yoksa indeks hazırlanmış splash deposundan (cache/splash_rois.bin) kurulur
+        loading_dir = loading_dir or find_loading_dir()
+        with self._index_lock:
+            self.splash_index = SplashIndex.load_or_build(loading_dir, index_path)
+        return self.splash_index
+
+    def update_index(self, loading_dir=None, index_path=INDEX_PATH):
+        """İndeksi arka planda günceller ve hazır olunca yerine koyar.
+
+        Yalnızca yeni/değişen görseller işlenir. Yeni indeksin sayfaları takas
+        öncesi ısıtılır; takas tek atamadır. Süren taramalar başladıkları
+        indeksle biter (eski mmap onlar bırakana kadar açık kalır).
+        """
+        loading_dir = loading_dir or find_loading_dir()
+        with self._index_lock:
+            index = SplashIndex.load_or_build(loading_dir, index_path)
+            if index:
+                index.touch_pages()
+                self.splash_index = index
+        return index
+
+    def warm(self):
+        """İlk taramanın gecikmesini öne çeker: ikon şablonları, thread başına
+        ORB nesneleri ve mmap'li indeks sayfaları."""
+        self.icons.refresh()
+        index = self.splash_index
+        if index:
+            index.touch_pages()
+        # havuzdaki her thread kendi eşleştiricisini oluştursun
+        barrier = threading.Barrier(self.workers)
+
+        def _touch():
+            self._orb()
+            self.icons._matchers()
+            try:
+                barrier.wait(timeout=1.0)
+            except threading.BrokenBarrierError:
+                pass
+
+        wait([self._pool.submit(_touch) for _ in range(self.workers)])
+        if index:
+            mem = index.memory_usage()
+            resident = "?" if mem["resident"] is None else f"{mem['resident'] / 2**20:.0f}"
+            print(f"[i] splash indeksi: {len(index)} görsel, {mem['mapped'] / 2**20:.0f} MB eşlenmiş,"
+                  f" {resident} MB yerleşik")
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _orb(self):
+        loc = self._local
+        if not hasattr(loc, "orb"):
+            loc.orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
+            loc.bf = cv2.BFMatcher(cv2.NORM_HAMMING)
+        return loc.orb
+
+    # --- tek çağrıda tanıma ---
+    def recognize(self, img_bgr, parallel=True, roster=None, layout=None):
+        """Seçim alanı görüntüsünü tanır -> ScanResult.
+
+        parallel=False tüm işleri çağıran thread'de çalıştırır (süreç havuzu
+        işçilerinde thread havuzuna gerek yok). roster verilirse (veya
+        self.roster ayarlıysa) splash araması o şampiyonlarla sınırlanır.
+        layout: seçim koordinatlarında calibration.CardLayout (bkz.
+        calibration.layout_for_image); None ise crops'un sabit oranları.
+        """
+        t0 = time.perf_counter()
+        index = self.splash_index   # tarama boyunca aynı indeks (arka planda takas edilebilir)
+        panels = extract_crops(img_bgr, layout)
+        champs = [SplashMatch()] * len(panels)
+        spells = [[Match() for _ in p["spells"]] for p in panels]
+
+        def on_spell(i, j, m):
+            spells[i][j] = m
+
+        if parallel:
+            futures = self.recognize_async(panels, on_spell=on_spell, roster=roster, index=index)
+            wait(futures)
+            champs = [f.result() for f in futures[:len(panels)]]  # splash işleri önde
+        else:
+            self.icons.refresh()
+            champ_ids = self._roster_ids(roster, index)
+            for i, p in enumerate(panels):
+                champs[i] = self._run_splash(i, p["splash"], None, champ_ids, index)
+                for j, crop in enumerate(p["spells"]):
+                    self._run_spell(i, j, crop, on_spell)
+        if self.unique_champions:
+            champs = assign_unique(champs, calibrator=self.calibrator)
+
+        result = [PanelResult(i, champs[i], tuple(spells[i])) for i in range(len(panels))]
+        return ScanResult(result, (time.perf_counter() - t0) * 1000.0)
+
+    # --- paralel çalıştırma ---
+    def recognize_async(self, panels, on_spell=None, on_splash=None, indices=None, roster=None,
+                        index=None, layout=None):
+        """Panelleri havuza dağıtır ve future listesini döner.
+
+        panels extract_crops çıktısı ya da seçim alanı görüntüsüdür (ndarray);
+        görüntü verilirse layout ile (None: sabit oranlar) burada kırpılır.
+
+        on_spell(panel_idx, spell_idx, Match), on_splash(panel_idx, SplashMatch)
+        indices verilirse yalnızca o paneller eşleştirilir. Splash future'ları
+        listede öndedir ve SplashMatch döner. Tüm paneller aynı indeksle
+        (verilmezse çağrı anındaki self.splash_index) eşleştirilir.
+        """
+        if isinstance(panels, np.ndarray):
+            panels = extract_crops(panels, layout)
+        self.icons.refresh()  # ikon değiştiyse bir kez, havuza dağıtmadan önce
+        index = index or self.splash_index
+        champ_ids = self._roster_ids(roster, index)
+        selected = [(i, p) for i, p in enumerate(panels) if indices is None or i in indices]
+        futures = []
+        # splash işleri daha ağır: önce onlar kuyruğa girsin
+        for i, p in selected:
+            futures.append(self._pool.submit(self._run_splash, i, p["splash"], on_splash, champ_ids,
+                                            index))
+        for i, p in selected:
+            for j, crop in enumerate(p["spells"]):
+                futures.append(self._pool.submit(self._run_spell, i, j, crop, on_spell))
+        return futures
+
+    def _roster_ids(self, roster=None, index=None):
+        # isim listesi -> indeks şampiyon numaraları (None = kısıt yok); numaralar
+        # indekse özgü, eşleştirme de aynı indeksle yapılmalı
+        roster = roster if roster is not None else self.roster
+        index = index or self.splash_index
+        if not roster or not index:
+            return None
+        ids = index.champion_ids(roster)
+        if len(ids) == 0:
+            print(f"[!] kadrodaki şampiyonlar indekste yok, kısıt uygulanmadı: {sorted(roster)}")
+            return None
+        return ids
+
+    def _run_splash(self, i, splash, callback, champ_ids=None, index=None):
+        try:
+            m = self.match_splash_ex(splash, champ_ids, index) if splash.size else SplashMatch()
+        except Exception as e:
+            print(f"[splash eşleştirme hatası] char{i+1}: {e}")
+            m = SplashMatch()
+        if callback:
+            callback(i, m)
+        return m
+
+    def _run_spell(self, i, j, crop, callback):
+        try:
+            m = self.match_spell(crop) if crop.size else Match()
+        except Exception as e:
+            print(f"[spell eşleştirme hatası] char{i+1}_spell{j+1}: {e}")
+            m = Match()
+        if callback:
+            callback(i, j, m)
+        return m
+
+    def _calibrated(self, kind, ranked, cls=Match, **extra):
+        # [(isim, skor), ...] skora göre azalan -> olasılıklı top-k ile en iyi aday
+        cands = self.calibrator.annotate(kind, [(n, _score(sc)) for n, sc in ranked])
+        if not cands:
+            return cls(**extra)
+        name, score, p = cands[0]
+        return cls(name, score, p, self.calibrator.accepts(kind, p), cands, **extra)
+
+    # --- spell eşleştirme ---
+    def match_spell(self, crop_bgr):
+        """Spell ikonu eşleştirme -> Match (olasılıklı top-k adaylar dahil)."""
+        return self._calibrated(self.spell_kind, self.icons.ranked(crop_bgr))
+
+    # --- splash eşleştirme ---
+    def match_splash(self, splash_bgr):
+        m = self.match_splash_ex(splash_bgr)
+        return m.name, m.score
+
+    def match_splash_ex(self, splash_bgr, champ_ids=None, index=None):
+        """Splash eşleştirme -> SplashMatch (kaç adayın doğrulandığı dahil).
+
+        champ_ids: yalnızca bu şampiyonların skinleri aranır (indeks bölümleri).
+        index: kullanılacak indeks (varsayılan self.splash_index).
+        """
+        index = index or self.splash_index
+        if not index:
+            return SplashMatch()
+
+        imr, gray = prep_for_match(splash_bgr)
+        orb = self._orb()
+        kp_s, des_s = orb.detectAndCompute(gray, None)
+        if des_s is None or len(des_s) == 0:
+            return SplashMatch()
+
+        # --- 1) Tüm indekste tek arama: görsel başına oy (yaklaşık, MIH) ---
+        rows, votes = index.vote(des_s, ratio=RATIO, champ_ids=champ_ids)
+        keep = self._shortlist(index, rows, votes)
+        if len(keep) == 0:
+            return SplashMatch()
+
+        cand_rows = rows[keep]
+        cand_hsc = index.hist_correl(hist_hsv(imr), cand_rows)
+        q_xy = np.float32([k.pt for k in kp_s])
+        bf = self._local.bf
+
+        champion_scores = {}  # { "Pantheon": en iyi skor, "Ekko": ... }
+        best_votes, evaluated = 0, 0
+
+        # --- 2) Kesin eşleşme kısa listede, oy sırasıyla: knn + ratio, sonra RANSAC ---
+        for n, (g, i, hsc) in enumerate(zip(keep, cand_rows, cand_hsc)):
+            # önceki adaylar zaten kesin sonuç verdiyse dur
+            if n and self._decisive(champion_scores, best_votes, votes[g]):
+                break
+            evaluated += 1
+            des_i = index.descriptors(i)
+            if len(des_i) < 2:
+                continue
+            good = [m for m, m2 in (p for p in bf.knnMatch(des_s, np.asarray(des_i), k=2) if len(p) == 2)
+                    if m.distance < RATIO * m2.distance]
+            if len(good) < MIN_GOOD:
+                continue
+            src_pts = q_xy[[m.queryIdx for m in good]].reshape(-1, 1, 2)
+            dst_pts = index.keypoints(i)[[m.trainIdx for m in good]].reshape(-1, 1, 2)
+            H, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
+            inliers = int(mask.sum()) if mask is not None else 0
+            if inliers < MIN_INLIERS:
+                continue
+            inlier_ratio = inliers / len(good)
+
+            hsc = (hsc + 1.0) * 50.0
+            final_score = 0.8 * (inlier_ratio * 100.0) + 0.2 * hsc
+
+            # --- 3) Şampiyon ismini dosya adından ayıkla ---
+            champ_name = index.champions[index.champ_of[i]]
+            if final_score > max(champion_scores.values(), default=-1.0):
+                best_votes = votes[g]
+            champion_scores[champ_name] = max(champion_scores.get(champ_name, -1.0), final_score)
+
+        # --- 4) En yüksek puanlı şampiyonu seç, olasılıkları kalibre et ---
+        ranked = sorted(champion_scores.items(), key=lambda kv: -kv[1])
+        return self._calibrated("champion", ranked, SplashMatch,
+                                evaluated=evaluated, shortlisted=len(keep))
+
+    def _shortlist(self, index, rows, votes):
+        """Oy alan görsellerden kesin eşleştirmeye girecekleri seçer (rows içindeki konumlar, oy sırasıyla).
+
+        Şampiyon katmanı: her şampiyonun puanı skinlerinin en yüksek oyudur; ilk
+        CHAMPION_SHORTLIST şampiyonun en çok oy alan SKINS_PER_CHAMPION skini alınır.
+        Böylece çok skinli bir şampiyon listeyi tek başına dolduramaz.
+        """
+        ok = np.flatnonzero(votes >= MIN_VOTES)
+        if len(ok) == 0:
+            return ok
+        # oy sırası (eşitlikte küçük satır önce)
+        ok = ok[np.lexsort((rows[ok], -votes[ok]))]
+        champ = index.champ_of[rows[ok]]
+        # her şampiyonun ilk göründüğü sıra = şampiyon sıralaması
+        _, first = np.unique(champ, return_index=True)
+        top = champ[np.sort(first)[:CHAMPION_SHORTLIST]]
+        picked, per = [], {}
+        for g, c in zip(ok, champ):
+            if c in top and per.get(c, 0) < SKINS_PER_CHAMPION:
+                per[c] = per.get(c, 0) + 1
+                picked.append(g)
+        return np.array(picked, dtype=np.int64)
+
+    def _decisive(self, champion_scores, best_votes, next_votes):
+        # en iyi skor eşiği geçti ve sıradaki aday oyda belirgin geride
+        if self.early_exit_score is None or not champion_scores:
+            return False
+        return (max(champion_scores.values()) >= self.early_exit_score
+                and best_votes >= self.early_exit_margin * next_votes)
+
+
+def compare_images(img_path_1, img_path_2):
+    """
+    İki görüntü arasındaki benzerliği hesaplar (yüzde olarak döner).
+    Görselleri 128x128'e ölçekler, gri yapar, MSE ve yapısal farkları kullanır.
+    """
+    try:
+        img1 = cv2.imread(img_path_1)
+        img2 = cv2.imread(img_path_2)
+
+        if img1 is None or img2 is None:
+            return -1.0
+
+        # Gri tonlamaya çevir
+        img1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
+        img2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
+
+        # Aynı boyuta getir
+        img1 = cv2.resize(img1, (128, 128))
+        img2 = cv2.resize(img2, (128, 128))
+
+        # MSE (Mean Squared Error)
+        err = np.sum((img1.astype("float") - img2.astype("float")) ** 2)
+        err /= float(img1.shape[0] * img1.shape[1])
+
+        # Basit benzerlik skoru (0–100 arası)
+        score = max(0, 100 - err / 50.0)
+        return round(score, 1)
+
+    except Exception as e:
+        print(f"[compare_images error] {e}")
+        return -1.0
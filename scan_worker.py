@@ -0,0 +1,273 @@
+from PyQt5 import QtCore, QtGui
+from concurrent.futures import wait, FIRST_COMPLETED
+import sys, threading, time
+
+from calibration import calibrate
+from capture import create_backend
+from crops import NUM_PANELS, extract_crops, dump_crops, panel_signature, signature_changed
+from recognizer import SplashMatch, assign_unique, find_loading_dir
+
+
+def exclude_from_capture(widget):
+    """Pencereyi ekran yakalamalarından hariç tutar (Windows 10 2004+).
+
+    Başarılıysa overlay ss öncesi gizlenmek zorunda kalmaz. Diğer platformlarda False.
+    """
+    if sys.platform != "win32":
+        return False
+    try:
+        import ctypes
+        WDA_EXCLUDEFROMCAPTURE = 0x11
+        return bool(ctypes.windll.user32.SetWindowDisplayAffinity(int(widget.winId()),
+                                                                  WDA_EXCLUDEFROMCAPTURE))
+    except Exception as e:
+        print(f"[i] yakalama dışı bırakma desteklenmiyor: {e}")
+        return False
+
+
+class HideHandshake(QtCore.QObject):
+    """Gizlenen pencere gerçekten ekrandan kalkınca ready yayar.
+
+    Sabit uyku yerine pencerenin Expose olayını dinler: pencere sistemi pencereyi
+    kaldırdığında (unmap) QWindow.isExposed() False olur. Kompozitörün son kareyi
+    sunması için bir ekran yenilemesi kadar daha beklenir. Olay gelmezse
+    timeout_ms sonunda yine devam edilir.
+    """
+    ready = QtCore.pyqtSignal()
+
+    def __init__(self, widget, timeout_ms=150):
+        super().__init__(widget)
+        self._done = False
+        self._window = widget.windowHandle()
+        screen = widget.screen() if hasattr(widget, "screen") else QtGui.QGuiApplication.primaryScreen()
+        hz = screen.refreshRate() if screen else 60.0
+        self._frame_ms = max(1, int(round(1000.0 / (hz or 60.0))))
+        QtCore.QTimer.singleShot(timeout_ms, self._finish)
+        if self._window is None or not self._window.isExposed():
+            self._unexposed()
+        else:
+            self._window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Expose and not obj.isExposed():
+            obj.removeEventFilter(self)
+            self._unexposed()
+        return False
+
+    def _unexposed(self):
+        QtCore.QTimer.singleShot(self._frame_ms, self._finish)
+
+    def _finish(self):
+        if self._done:
+            return
+        self._done = True
+        if self._window is not None:
+            self._window.removeEventFilter(self)
+        self.ready.emit()
+        self.deleteLater()
+
+
+class ScanJob(QtCore.QThread):
+    """Ekran yakalama + tanıma zincirini GUI thread'i dışında çalıştırır.
+
+    rect verilirse önce ekran görüntüsü alınır, image verilirse doğrudan o
+    görüntü taranır. Tüm sinyaller ana thread'e queued olarak ulaşır.
+    """
+    progress = QtCore.pyqtSignal(int, str)                   # yüzde, mesaj
+    captured = QtCore.pyqtSignal()                           # ss alındı, overlay geri gösterilebilir
+    spellMatched = QtCore.pyqtSignal(int, int, object)       # panel, spell, Match
+    splashMatched = QtCore.pyqtSignal(int, object)           # panel, SplashMatch
+    finishedScan = QtCore.pyqtSignal(bool)                   # True = iptal edildi
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, engine, rect=None, image=None, dump_dir=None, capture=None, layout=None,
+                 parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.rect = rect          # (x, y, w, h)
+        self.image = image
+        self.layout = layout      # calibration.CardLayout (seçim koordinatlarında) veya None
+        self.dump_dir = dump_dir
+        self.capture_spec = capture   # capture.create_backend spec'i (None = en hızlı olan)
+        self._capture = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            print(f"[tarama hatası] {e}")
+            self.failed.emit(str(e))
+        finally:
+            if self._capture is not None:
+                self._capture.close()
+                self._capture = None
+
+    def _run(self):
+        img = self.image
+        if img is None:
+            self.progress.emit(0, "Ekran yakalanıyor")
+            img = self._grab()
+            self.captured.emit()
+
+        panels = extract_crops(img, self.layout)
+        if self.dump_dir:
+            dump_crops(img, panels, self.dump_dir)
+        if not panels:
+            print("[-] Kırpılmış görsel yok.")
+            self.finishedScan.emit(False)
+            return
+
+        self._ensure_index()
+        if self._cancel.is_set():
+            self.finishedScan.emit(True)
+            return
+
+        # 5 splash + 10 spell işi havuza dağıtılır
+        futures = self.engine.recognize_async(panels,
+                                              on_spell=self._emit_spell,
+                                              on_splash=self._emit_splash)
+        pending = set(futures)
+        total = len(pending)
+        while pending:
+            done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            if self._cancel.is_set():
+                for f in pending:
+                    f.cancel()
+                self.finishedScan.emit(True)
+                return
+            if done:
+                pct = 10 + int(90 * (total - len(pending)) / max(1, total))
+                self.progress.emit(pct, "Eşleştiriliyor")
+        self._resolve([f.result() for f in futures[:len(panels)]])
+        self.finishedScan.emit(False)
+
+    def _grab(self):
+        # arka uç bu thread'de oluşturulur (X bağlantısı thread'e özel)
+        if self._capture is None:
+            self._capture = create_backend(self.capture_spec)
+            print(f"[i] ekran yakalama: {self._capture.name}")
+        x, y, w, h = self.rect
+        return self._capture.grab(x, y, w, h)
+
+    def _ensure_index(self):
+        if not self.engine.splash_index:
+            self.progress.emit(5, "Splash indeksi yükleniyor")
+            if not self.engine.load_index(find_loading_dir()):
+                print("[-] Splash indeksi kurulamadı (loading klasörü ve splash deposu yok).")
+            self.engine.warm()
+
+    def _resolve(self, matches, fixed=()):
+        """Takımda tekrar eden şampiyonları birlikte yeniden atar; değişenleri yeniden yayar."""
+        if not self.engine.unique_champions:
+            return matches
+        resolved = assign_unique(matches, fixed, calibrator=self.engine.calibrator)
+        for i, (old, new) in enumerate(zip(matches, resolved)):
+            if old != new:
+                print(f"[i] char{i+1}: {old.name} -> {new.name if new.confident else '?'} (takımda tekrar)")
+                self._emit_splash(i, new)
+        return resolved
+
+    # iptalden sonra gelen sonuçlar kartlara yazılmasın
+    def _emit_spell(self, i, j, m):
+        if not self._cancel.is_set():
+            self.spellMatched.emit(i, j, m)
+
+    def _emit_splash(self, i, m):
+        if not self._cancel.is_set():
+            self.splashMatched.emit(i, m)
+
+
+class WatchJob(ScanJob):
+    """İzleme modu: seçili alanı düşük FPS ile yakalar, yalnızca değişen panelleri tanır.
+
+    Her karede panel başına ucuz bir imza (8x8 ortalama hash) hesaplanır. İmza son
+    tanınan halden farklıysa ve iki ardışık karede sabit kaldıysa (geçiş animasyonu
+    bitti) o panel için splash + spell eşleştirmesi çalışır.
+    """
+    FPS = 2.0
+    CHANGE_BITS = 10   # hash başına bu kadar bitten fazla fark = değişti
+
+    def __init__(self, engine, rect, fps=None, capture=None, layout=None, parent=None):
+        super().__init__(engine, rect=rect, capture=capture, layout=layout, parent=parent)
+        self.fps = fps or self.FPS
+
+    def _run(self):
+        period = 1.0 / max(0.1, self.fps)
+        prev_sig, done_sig = {}, {}
+        inflight, batch = [], []
+        matches = [SplashMatch()] * NUM_PANELS   # panel başına son splash sonucu
+        self._ensure_index()
+        while not self._cancel.is_set():
+            t0 = time.monotonic()
+            frame = self._grab()
+            panels = extract_crops(frame, self.layout)
+
+            if inflight and all(f.done() for f in inflight):
+                # tur bitti: yeni sonuçlar, taranmayan panellerdeki şampiyonlarla çakışmasın
+                for i, f in zip(batch, inflight):
+                    matches[i] = f.result()
+                matches = self._resolve(matches, fixed=set(range(NUM_PANELS)) - set(batch))
+                inflight, batch = [], []
+            if not inflight:
+                changed = []
+                for i, p in enumerate(panels):
+                    sig = panel_signature(p)
+                    stable = i in prev_sig and not signature_changed(prev_sig[i], sig, self.CHANGE_BITS)
+                    prev_sig[i] = sig
+                    if stable and (i not in done_sig or signature_changed(done_sig[i], sig, self.CHANGE_BITS)):
+                        done_sig[i] = sig
+                        changed.append(i)
+                if changed:
+                    print(f"[i] izleme: değişen paneller -> {[i + 1 for i in changed]}")
+                    # yakalama tamponu bir sonraki karede ezilir: eşleştirmeye kopya gider
+                    panels = extract_crops(frame.copy(), self.layout)
+                    inflight = self.engine.recognize_async(panels,
+                                                           on_spell=self._emit_spell,
+                                                           on_splash=self._emit_splash,
+                                                           indices=changed)
+                    batch = changed   # inflight'ın ilk len(changed) elemanı splash işleri
+            self._cancel.wait(max(0.0, period - (time.monotonic() - t0)))
+
+        for f in inflight:
+            f.cancel()
+        self.finishedScan.emit(True)
+
+
+class CalibrationJob(QtCore.QThread):
+    """Ekranın tamamını yakalayıp kart/spell geometrisini bulur (calibration.calibrate).
+
+    Sonuç ekran koordinatlarında CardLayout listesidir (yukarıdan aşağıya sıralar).
+    """
+    calibrated = QtCore.pyqtSignal(object)   # [CardLayout, ...]
+    captured = QtCore.pyqtSignal()
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, rect, capture=None, parent=None):
+        super().__init__(parent)
+        self.rect = rect          # (x, y, w, h): genelde ekranın tamamı
+        self.capture_spec = capture
+
+    def run(self):
+        backend = None
+        try:
+            backend = create_backend(self.capture_spec)
+            x, y, w, h = self.rect
+            img = backend.grab(x, y, w, h).copy()
+            self.captured.emit()
+            layouts = [l.shifted(x, y) for l in calibrate(img)]
+            if not layouts:
+                raise RuntimeError("kart çerçevesi bulunamadı (yükleme ekranı açık mı?)")
+            self.calibrated.emit(layouts)
+        except Exception as e:
+            print(f"[kalibrasyon hatası] {e}")
+            self.failed.emit(str(e))
+        finally:
+            if backend is not None:
+                backend.close()
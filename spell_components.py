@@ -1,4 +1,6 @@
 from PyQt5 import QtWidgets, QtGui, QtCore
+from cooldown_scheduler import shared_scheduler
+from game_data import SUMMONER_HASTE, summoner_cooldown, summoner_haste
 import os
 
 # --- ikon klasörü ---
@@ -9,18 +11,19 @@ SPELLS = [
     "heal", "ignite", "smite", "teleport"
 ]
 
-COOLDOWNS = {
-    "flash": 300, "ignite": 180, "smite": 15, "heal": 240,
-    "barrier": 180, "cleanse": 210, "ghost": 210,
-    "exhaust": 210, "teleport": 360
+# sağ tık menüsündeki büyü hızı kaynakları (game_data.SUMMONER_HASTE anahtarları)
+HASTE_LABELS = {
+    "cosmic_insight": "Cosmic Insight",
+    "ionian_boots": "Ionian Boots",
 }
 
 
 # 🔹 Spell seçim penceresi
 class SpellSelectWindow(QtWidgets.QWidget):
+    """suggestions: taramanın adayları [(isim, olasılık), ...]; ızgarada önce bunlar gelir."""
     spell_selected = QtCore.pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, suggestions=()):
         super().__init__()
         self.setWindowFlags(QtCore.Qt.Popup)
         self.setFixedSize(300, 200)
@@ -28,14 +31,20 @@ class SpellSelectWindow(QtWidgets.QWidget):
         grid.setSpacing(8)
         grid.setContentsMargins(10, 10, 10, 10)
 
-        for i, spell in enumerate(SPELLS):
+        probs = {n: p for n, p in suggestions if n in SPELLS}
+        ordered = list(probs) + [s for s in SPELLS if s not in probs]
+        for i, spell in enumerate(ordered):
             btn = QtWidgets.QPushButton()
             icon_path = self._find_icon(spell)
             if icon_path:
                 btn.setIcon(QtGui.QIcon(icon_path))
                 btn.setIconSize(QtCore.QSize(48, 48))
             btn.setFixedSize(56, 56)
-            btn.setStyleSheet("background:#2c2c2c; border-radius:6px;")
+            if spell in probs:
+                btn.setToolTip(f"{spell} (%{probs[spell] * 100:.0f})")
+                btn.setStyleSheet("background:#2c2c2c; border:2px solid #ff9900; border-radius:6px;")
+            else:
+                btn.setStyleSheet("background:#2c2c2c; border-radius:6px;")
             btn.clicked.connect(lambda _, s=spell: self._choose(s))
             grid.addWidget(btn, i // 5, i % 5)
 
@@ -57,33 +66,28 @@ class TimerBox(QtWidgets.QLabel):
         super().__init__()
         self.remaining = 0
         self.cooldown_time = 0
-        self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self._tick)
 
         self.setFixedSize(48, 22)
         self.setAlignment(QtCore.Qt.AlignCenter)
         self.setText("0")
         self._update_style(active=False)
 
-    def start(self, spell: str):
-        self.cooldown_time = COOLDOWNS.get(spell, 60)
-        self.remaining = self.cooldown_time
+    def start(self, spell: str, haste: int = 0):
+        # süre summoner.json'dan; büyü hızı başlatma anında uygulanır
+        self.cooldown_time = summoner_cooldown(spell, haste)
         self._update_style(active=True)
-        self._update_label()
-        self.timer.start(1000)
+        # geri sayım ortak zamanlayıcıda (monotonik bitiş anı, tek QTimer)
+        shared_scheduler().start(self, self.cooldown_time, self._on_remaining, self.stop)
 
     def stop(self):
-        self.timer.stop()
+        shared_scheduler().cancel(self)
         self.remaining = 0
         self._update_style(active=False)
         self.setText("0")
 
-    def _tick(self):
-        self.remaining -= 1
-        if self.remaining <= 0:
-            self.stop()
-        else:
-            self._update_label()
+    def _on_remaining(self, seconds):
+        self.remaining = seconds
+        self._update_label()
 
     def _update_label(self):
         self.setText(str(self.remaining))
@@ -103,11 +107,14 @@ class TimerBox(QtWidgets.QLabel):
 # 🔹 Spell butonu (ikon + alt sayaç)
 class SpellButton(QtWidgets.QWidget):
     spell_changed = QtCore.pyqtSignal(str)
+    modifiers_changed = QtCore.pyqtSignal(object)   # frozenset (SUMMONER_HASTE anahtarları)
 
     def __init__(self, default_spell="flash"):
         super().__init__()
         self.current_spell = default_spell
         self.mode = "edit"
+        self.modifiers = frozenset()   # oyuncunun büyü hızı kaynakları
+        self.candidates = ()           # son taramanın adayları [(isim, olasılık), ...]
 
         layout = QtWidgets.QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -144,20 +151,45 @@ class SpellButton(QtWidgets.QWidget):
             self.button.setIcon(QtGui.QIcon(path))
             self.button.setText("")
         else:
+            # "?" (emin olunmayan tarama sonucu) ya da ikonu olmayan büyü: önceki ikon kalmasın
+            self.button.setIcon(QtGui.QIcon())
             self.button.setText(self.current_spell.capitalize())
 
     def _handle_click(self):
-        if self.mode == "use":
-            self.timer_box.start(self.current_spell)
+        # büyüsü bilinmeyen butonda sayaç yerine seçim penceresi (adaylar önce)
+        if self.mode == "use" and self.current_spell != "?":
+            self.timer_box.start(self.current_spell, haste=summoner_haste(self.modifiers))
         else:
             self._open_selector()
 
     def _open_selector(self):
-        self.selector = SpellSelectWindow()
+        self.selector = SpellSelectWindow(self.candidates)
         self.selector.spell_selected.connect(self.set_spell)
         self.selector.move(QtGui.QCursor.pos())
         self.selector.show()
 
+    def set_candidates(self, candidates):
+        """Taramanın top-k adayları; seçim penceresi bunlarla sıralı açılır."""
+        self.candidates = tuple(candidates)
+
+    def set_modifiers(self, modifiers):
+        self.modifiers = frozenset(modifiers)
+
+    def contextMenuEvent(self, event):
+        """Sağ tık: oyuncunun büyü hızı kaynaklarını aç/kapat (sonraki sayaçlara uygulanır)."""
+        menu = QtWidgets.QMenu(self)
+        for key, label in HASTE_LABELS.items():
+            act = menu.addAction(f"{label} (+{SUMMONER_HASTE[key]})")
+            act.setCheckable(True)
+            act.setChecked(key in self.modifiers)
+            act.setData(key)
+        chosen = menu.exec_(event.globalPos())
+        if chosen is not None:
+            key = chosen.data()
+            mods = self.modifiers - {key} if key in self.modifiers else self.modifiers | {key}
+            self.set_modifiers(mods)
+            self.modifiers_changed.emit(self.modifiers)
+
     def set_spell(self, spell):
         self.current_spell = spell
         self._update_icon()
@@ -0,0 +1,163 @@
+import os, glob, threading
+import cv2
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --- ikon klasörü ---
+ICON_DIR = os.path.join(os.path.dirname(__file__), "assets", "icons")
+ICON_SIZE = (96, 96)
+ORB_FEATURES = 500
+
+# spell eşleştirme yöntemleri: "orb" (ORB + LAB histogram) veya "ncc" (normalize çapraz korelasyon)
+SPELL_MATCHERS = ("orb", "ncc")
+DEFAULT_SPELL_MATCHER = "orb"
+# NCC: ~27 px'lik kırpıntılar için ORB yerine küçük gri yamalar. Kırpma kartın
+# çerçevesini de içerebildiği için kırpıntının her konum/ölçekteki alt pencereleri
+# tek matris çarpımıyla tüm şablonlara karşı puanlanır.
+NCC_SIZE = 16                  # şablon ve pencere kenarı (px)
+NCC_MARGIN = 0.15              # ikon kenarından kırpılan oran (kenar süsü kırpıntıda yok)
+NCC_SCALES = (0.7, 0.8, 0.9)   # pencere kenarı / kırpıntı kenarı
+
+
+def lab_hist(img_bgr):
+    lab = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2LAB)
+    hist = cv2.calcHist([lab], [0,1,2], None, [8,8,8], [0,256,0,256,0,256])
+    return cv2.normalize(hist, hist).flatten()
+
+
+def _unit_rows(m):
+    # satır başına ortalamayı çıkar, birim norma getir -> iç çarpım = NCC
+    m = m - m.mean(axis=1, keepdims=True)
+    return m / (np.linalg.norm(m, axis=1, keepdims=True) + 1e-6)
+
+
+def ncc_template(icon_bgr):
+    """İkonun kenarı kırpılmış, NCC_SIZE'a küçültülmüş gri yaması -> (NCC_SIZE²,) birim vektör."""
+    h, w = icon_bgr.shape[:2]
+    m = int(round(min(h, w) * NCC_MARGIN))
+    gray = cv2.cvtColor(icon_bgr[m:h - m, m:w - m], cv2.COLOR_BGR2GRAY)
+    patch = cv2.resize(gray, (NCC_SIZE, NCC_SIZE), interpolation=cv2.INTER_AREA)
+    return _unit_rows(patch.reshape(1, -1).astype(np.float32))[0]
+
+
+def ncc_windows(crop_bgr):
+    """Kırpıntının NCC_SCALES ölçeklerindeki tüm 1 px kaydırmalı pencereleri -> (N, NCC_SIZE²)."""
+    gray = cv2.cvtColor(crop_bgr, cv2.COLOR_BGR2GRAY)
+    out = []
+    for s in NCC_SCALES:
+        # pencereyi küçültmek yerine kırpıntıyı büyüt: ölçek başına tek resize
+        n = max(NCC_SIZE, int(round(NCC_SIZE / s)))
+        big = cv2.resize(gray, (n, n), interpolation=cv2.INTER_AREA)
+        win = sliding_window_view(big, (NCC_SIZE, NCC_SIZE))
+        out.append(win.reshape(-1, NCC_SIZE * NCC_SIZE))
+    return _unit_rows(np.concatenate(out).astype(np.float32))
+
+
+class IconTemplates:
+    """assets/icons altındaki spell ikonlarının ORB + LAB histogram ve NCC şablonları.
+
+    İlk kullanımda bir kez hesaplanır; refresh() ikon dosyalarının mtime/boyutu
+    değiştiyse şablonları yeniden oluşturur. method ranked()'in kullandığı
+    yöntemdir (SPELL_MATCHERS).
+    """
+
+    def __init__(self, icons_dir=ICON_DIR, method=DEFAULT_SPELL_MATCHER):
+        if method not in SPELL_MATCHERS:
+            raise ValueError(f"bilinmeyen spell eşleştirme yöntemi: {method} ({', '.join(SPELL_MATCHERS)})")
+        self.icons_dir = icons_dir
+        self.method = method
+        self.templates = []   # [{"name", "des", "hist"}, ...]
+        self._ncc = ([], np.zeros((0, NCC_SIZE * NCC_SIZE), np.float32))   # (isimler, şablon matrisi)
+        self._signature = None
+        self._local = threading.local()  # ranked birden çok thread'den çağrılabilir
+
+    def _matchers(self):
+        loc = self._local
+        if not hasattr(loc, "orb"):
+            loc.orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
+            loc.bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+        return loc.orb, loc.bf
+
+    def _scan(self):
+        files = sorted(glob.glob(os.path.join(self.icons_dir, "*.png")))
+        sig = []
+        for p in files:
+            try:
+                s = os.stat(p)
+            except OSError:
+                continue
+            sig.append((p, s.st_mtime_ns, s.st_size))
+        return tuple(sig)
+
+    def refresh(self):
+        """İkonlar değiştiyse (veya hiç yüklenmediyse) şablonları yeniden kurar."""
+        sig = self._scan()
+        if sig == self._signature:
+            return False
+        orb, _ = self._matchers()
+        templates = []
+        for p, _, _ in sig:
+            icon = cv2.imread(p)
+            if icon is None:
+                continue
+            icon_resized = cv2.resize(icon, ICON_SIZE)
+            icon_gray = cv2.cvtColor(icon_resized, cv2.COLOR_BGR2GRAY)
+            _, des = orb.detectAndCompute(icon_gray, None)
+            templates.append({
+                "name": os.path.basename(p).replace(".png", ""),
+                "des": des,
+                "hist": lab_hist(icon_resized),
+                "ncc": ncc_template(icon),
+            })
+        self.templates = templates
+        # isimler ve matris birlikte değişsin (başka thread'ler okurken)
+        self._ncc = ([t["name"] for t in templates],
+                     np.stack([t["ncc"] for t in templates]) if templates
+                     else np.zeros((0, NCC_SIZE * NCC_SIZE), np.float32))
+        self._signature = sig
+        print(f"[+] spell ikon şablonları yüklendi ({len(templates)})")
+        return True
+
+    def best_match(self, img_bgr):
+        """Kırpılmış spell görselini şablonlarla karşılaştırır -> (isim, skor)."""
+        ranked = self.ranked(img_bgr)
+        return ranked[0] if ranked else ("?", -1.0)
+
+    def ranked(self, img_bgr):
+        """Tüm şablonların skorları -> [(isim, skor), ...] skora göre azalan."""
+        if self._signature is None:
+            self.refresh()
+        if self.method == "ncc":
+            return self._ranked_ncc(img_bgr)
+        orb, bf = self._matchers()
+        img_resized = cv2.resize(img_bgr, ICON_SIZE)
+        img_gray = cv2.cvtColor(img_resized, cv2.COLOR_BGR2GRAY)
+        _, des1 = orb.detectAndCompute(img_gray, None)
+        if des1 is None:
+            return []
+        hist1 = lab_hist(img_resized)
+
+        scores = []
+        for t in self.templates:
+            if t["des"] is None:
+                continue
+            matches = bf.match(des1, t["des"])
+            if len(matches) == 0:
+                continue
+            orb_score = np.mean([m.distance for m in matches])
+            # LAB histogram farkı
+            hist_score = cv2.compareHist(hist1, t["hist"], cv2.HISTCMP_CORREL)
+            final_score = (100 - orb_score) * 0.5 + (hist_score * 100) * 0.5
+            scores.append((t["name"], float(final_score)))
+        # eşitlikte şablon sırası korunur (eski best_match ilk en iyiyi seçiyordu)
+        scores.sort(key=lambda c: -c[1])
+        return scores
+
+    def _ranked_ncc(self, img_bgr):
+        # skor = en iyi penceredeki korelasyon x 100 (-100..100)
+        names, mat = self._ncc
+        if not names or min(img_bgr.shape[:2]) < 4:
+            return []
+        best = (ncc_windows(img_bgr) @ mat.T).max(axis=0)
+        order = np.argsort(-best, kind="stable")
+        return [(names[k], float(best[k]) * 100.0) for k in order]
@@ -0,0 +1,583 @@
+import os, json, glob
+import cv2
+import numpy as np
+
+# --- indeks dosyası ---
+# Biçim: MAGIC | uint32 başlık uzunluğu | JSON başlık | hizalı ham diziler.
+# Diziler np.memmap ile açılır, yani sonraki açılışlarda hiçbir şey yeniden hesaplanmaz.
+INDEX_VERSION = 6
+INDEX_MAGIC = b"LSSIDX01"
+INDEX_PATH = os.path.join(os.path.dirname(__file__), "cache", "splash_index.bin")
+ORB_FEATURES = 1200
+# keypoint koordinatları uint16 sabit noktalı: 1/64 px çözünürlük, 1023 px'e kadar
+# (ROI 256x256; RANSAC eşiği 5 px). float32'ye göre yarı boyut.
+KP_SCALE = 64
+IMAGE_EXTS = ("*.jpg", "*.jpeg", "*.png")
+_ALIGN = 64
+
+# --- descriptor oylaması (multi-index hashing) ---
+# 256 bitlik ORB descriptor'ı 16 adet 16 bitlik parçaya bölünür; her parça için
+# descriptor'lar parça değerine (kovaya) göre sıralanır. Sorgu, parçalardan en az
+# biri birebir tutan descriptor'ları aday alır. Bu yaklaşıktır: gerçek ORB
+# eşleşmeleri çoğunlukla 20-40 bit uzakta olduğundan brute-force knn + ratio
+# eşleşmelerinin ancak ~%10'u aday olur. O yüzden yalnızca görselleri sıralamaya
+# (oy) yarar; RANSAC'a giden eşleşmeler kısa listedeki her görselde tam arama
+# ile yeniden bulunur (RecognitionEngine.match_splash_ex).
+MIH_CHUNKS = 16
+# MIH_BUCKET_CAP'ten kalabalık kovalar indekse hiç yazılmaz: yaygın parça
+# değerleri ayırt edici değil ve aday listesini (np.repeat açılımı) patlatır
+MIH_BUCKET_CAP = 32
+ANN_MAX_DIST = 64      # bundan uzak aday oy sayılmaz
+
+# --- hazırlanmış splash deposu ---
+# Biçim: MAGIC | art arda JPEG baytları | JSON altbilgi | uint32 altbilgi uzunluğu | MAGIC.
+# Her kayıt prep_for_match çıktısı (256x256, CLAHE uygulanmış BGR ROI). İndeks
+# bu depodan kurulur; loading/ klasörü yalnızca yeni skin eklenince gerekir.
+# prep_for_match değişirse STORE_VERSION artırılmalı.
+STORE_VERSION = 1
+STORE_MAGIC = b"LSSROI01"
+STORE_PATH = os.path.join(os.path.dirname(__file__), "cache", "splash_rois.bin")
+ROI_JPEG_QUALITY = 95  # 95'te eşleştirme skoru değişmiyor (benchmark), ~31 KB/kayıt
+
+
+def prep_for_match(img_bgr):
+    h, w = img_bgr.shape[:2]
+    # orta-%70 yatay, üst-%75 dikey (yüz/omuz odak)
+    x0 = int(w * 0.15); x1 = int(w * 0.85)
+    y0 = int(h * 0.05); y1 = int(h * 0.80)
+    roi = img_bgr[y0:y1, x0:x1]
+
+    # boyut sabitle
+    roi = cv2.resize(roi, (256, 256), interpolation=cv2.INTER_AREA)
+
+    # kontrast/aydınlık dengeleme (CLAHE, LAB-L kanal)
+    lab = cv2.cvtColor(roi, cv2.COLOR_BGR2LAB)
+    L, A, B = cv2.split(lab)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+    L = clahe.apply(L)
+    lab = cv2.merge([L,A,B])
+    roi = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+    return roi, gray
+
+
+_POPCNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount64(x):
+    x = np.asarray(x, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(x)
+    return _POPCNT8[x.view(np.uint8)].reshape(x.shape + (8,)).sum(-1)
+
+
+def hist_hsv(img_bgr):
+    hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0,1,2], None, [8,8,8], [0,180,0,256,0,256])
+    hist = cv2.normalize(hist, hist).flatten()
+    return hist
+
+
+def champion_of(name):
+    # dosya adı biçimi: <Şampiyon>_<skin no>.jpg
+    return os.path.basename(name).split("_")[0]
+
+
+def list_images(loading_dir):
+    files = []
+    for ext in IMAGE_EXTS:
+        files += glob.glob(os.path.join(loading_dir, ext))
+    # şampiyona göre grupla: bir şampiyonun skinleri indekste ardışık durur
+    return sorted(files, key=lambda p: (champion_of(p), os.path.basename(p)))
+
+
+class SplashIndex:
+    """loading/ klasöründeki splash'lerin histogram ve ORB verisi.
+
+    Tüm veri birkaç düz dizide tutulur; i. görselin keypoint/descriptor'ları
+    kp_offsets[i]:kp_offsets[i+1] aralığındadır.
+    """
+
+    def __init__(self, names, stats, hists, hist_mean, hist_norm, kp_offsets, kp_xy, des,
+                 mih_order, mih_starts):
+        self.names = names            # dosya adları ("Ahri_0.jpg" ...)
+        self.stats = stats            # [(mtime_ns, size), ...] — dosya bazlı geçersizleme için
+        self.hist = hists             # (N, 512) float32
+        self.hist_mean = hist_mean    # (N,) float64 — korelasyon için satır ortalaması
+        self.hist_norm = hist_norm    # (N,) float64 — ortalaması çıkarılmış satır normu
+        self.kp_offsets = kp_offsets  # (N+1,) int64
+        self.kp_xy = kp_xy            # (K, 2) uint16, piksel * KP_SCALE
+        self.des = des                # (K, 32) uint8
+        self.mih_order = mih_order    # (M,) uint32 — parça ve kova sırasıyla descriptor numaraları
+        self.mih_starts = mih_starts  # (MIH_CHUNKS, 65537) int64 — m. parçanın v kovası
+                                      # mih_order[starts[m, v]:starts[m, v + 1]]
+        self.path = None              # load() ile açıldıysa dosya yolu (resident ölçümü için)
+
+        # şampiyon katmanı: "Ahri_3.jpg" -> "Ahri"; satır başına şampiyon numarası
+        champs = [champion_of(n) for n in names]
+        self.champions = sorted(set(champs))                     # ~171 şampiyon
+        lookup = {c: k for k, c in enumerate(self.champions)}
+        self.champ_of = np.array([lookup[c] for c in champs], dtype=np.int32)
+        # şampiyon bölümleri: c. şampiyonun satırları champ_rows[c]:champ_rows[c+1]
+        # (eski sıralı bir dosya açıldıysa None; o zaman satır bazında süzülür)
+        if np.all(np.diff(self.champ_of) >= 0):
+            self.champ_rows = np.searchsorted(self.champ_of, np.arange(len(self.champions) + 1))
+        else:
+            self.champ_rows = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def keypoints(self, i):
+        return self.points(slice(self.kp_offsets[i], self.kp_offsets[i + 1]))
+
+    def points(self, idx):
+        """Genel descriptor numaraları (dizi veya slice) için float32 piksel koordinatları."""
+        return np.asarray(self.kp_xy[idx], dtype=np.float32) * np.float32(1.0 / KP_SCALE)
+
+    def memory_usage(self):
+        """İndeks dizilerinin eşlenmiş ve fiilen RAM'de duran (resident) boyutu, byte.
+
+        resident yalnızca Linux'ta ölçülür (/proc/self/smaps); diğer platformlarda None.
+        Dosyadan açılmamış (bellekte kurulmuş) indekste ikisi de eşittir.
+        """
+        mapped = sum(int(a.nbytes) for a in self._arrays().values())
+        if self.path is None:
+            return {"mapped": mapped, "resident": mapped}
+        return {"mapped": mapped, "resident": _mapped_rss(self.path)}
+
+    def touch_pages(self):
+        """Eşlenmiş tüm dizilerin sayfalarını önbelleğe alır (her 4 KB'den bir bayt okunur)."""
+        for a in self._arrays().values():
+            int(np.asarray(a).reshape(-1).view(np.uint8)[::4096].sum())
+
+    def descriptors(self, i):
+        return self.des[self.kp_offsets[i]:self.kp_offsets[i + 1]]
+
+    def hist_correl(self, hist, rows=None):
+        """cv2.HISTCMP_CORREL'in vektörel hali (rows=None -> tüm satırlar)."""
+        h, mean, norm = self.hist, self.hist_mean, self.hist_norm
+        if rows is not None:
+            h, mean, norm = h[rows], mean[rows], norm[rows]
+        q = np.asarray(hist, dtype=np.float32).ravel()
+        q_mean = float(q.mean(dtype=np.float64))
+        q_norm = float(np.sqrt(np.sum((q.astype(np.float64) - q_mean) ** 2)))
+        num = np.dot(h, q).astype(np.float64) - q.size * mean * q_mean
+        den = norm * q_norm
+        return np.where(den > np.finfo(np.float64).eps, num / np.maximum(den, 1e-300), 1.0)
+
+    def champion_ids(self, names):
+        """Şampiyon isimlerini numaralara çevirir; bilinmeyen isimler atlanır."""
+        lookup = {c: k for k, c in enumerate(self.champions)}
+        return np.array(sorted({lookup[n] for n in names if n in lookup}), dtype=np.int64)
+
+    def _allowed(self, cd, champ_ids):
+        # cd: genel descriptor numaraları -> yalnızca champ_ids şampiyonlarına ait olanlar
+        if self.champ_rows is not None:
+            # bölümler ardışık: her şampiyon tek bir descriptor aralığı
+            lo = np.asarray(self.kp_offsets[self.champ_rows[champ_ids]])
+            hi = np.asarray(self.kp_offsets[self.champ_rows[champ_ids + 1]])
+            k = np.searchsorted(lo, cd, side="right") - 1
+            return (k >= 0) & (cd < hi[np.maximum(k, 0)])
+        rows = np.searchsorted(self.kp_offsets, cd, side="right") - 1
+        return np.isin(self.champ_of[rows], champ_ids)
+
+    def vote(self, des_q, ratio=0.75, max_dist=ANN_MAX_DIST, champ_ids=None):
+        """Sorgu descriptor'larıyla tüm indekste görsel başına oy sayar (multi-index hashing).
+
+        Yaklaşıktır (bkz. MIH_CHUNKS): bir sorgu descriptor'ı, adayları arasında
+        o görselden en yakını max_dist'ten yakınsa o görsele bir oy verir; aynı
+        görselden ikinci bir aday da bulunduysa ratio testi ayrıca uygulanır.
+        champ_ids verilirse yalnızca o şampiyonların skinleri aday olur.
+        Dönüş: oy alan görseller ve oyları (rows, votes), görsel numarasına göre sıralı.
+        """
+        empty = np.zeros(0, np.int64)
+        K = len(self.des)
+        if K == 0 or des_q is None or len(des_q) == 0:
+            return empty, empty
+        if champ_ids is not None and len(champ_ids) == 0:
+            return empty, empty
+        q = np.ascontiguousarray(des_q, dtype=np.uint8)
+        q16 = q.view(np.uint16)                       # (Q, 16) parça anahtarları
+
+        cq, cd = [], []
+        for m in range(MIH_CHUNKS):
+            key = q16[:, m].astype(np.int64)
+            lo = np.asarray(self.mih_starts[m, key])
+            n = np.asarray(self.mih_starts[m, key + 1]) - lo   # kova boyutu <= MIH_BUCKET_CAP
+            total = int(n.sum())
+            if total == 0:
+                continue
+            # her sorgu için [lo, lo + n) aralığını düz listeye aç
+            qi = np.repeat(np.arange(len(q)), n)
+            pos = np.repeat(lo - np.cumsum(n) + n, n) + np.arange(total)
+            di = np.asarray(self.mih_order[pos], dtype=np.int64)
+            if champ_ids is not None:
+                ok = self._allowed(di, champ_ids)
+                qi, di = qi[ok], di[ok]
+            cq.append(qi)
+            cd.append(di)
+        if not cq:
+            return empty, empty
+
+        cq, cd = np.concatenate(cq), np.concatenate(cd)
+        dist = popcount64(q.view(np.uint64)[cq] ^ np.asarray(self.des).view(np.uint64)[cd]).sum(axis=1)
+        rows = np.searchsorted(self.kp_offsets, cd, side="right") - 1
+
+        # (sorgu, görsel) grubu içinde mesafeye göre tek anahtarla sırala
+        group = cq * len(self) + rows
+        o = np.argsort(group * 512 + dist, kind="stable")
+        group, cd, dist, rows = group[o], cd[o], dist[o], rows[o]
+        first = np.ones(len(group), dtype=bool)
+        first[1:] = group[1:] != group[:-1]
+        fi = np.flatnonzero(first)
+        end = np.r_[fi[1:], len(group)]
+        # ikinci aday: gruptaki en yakından farklı ilk descriptor (aynı çift
+        # birden çok parçadan gelmiş olabilir)
+        other = np.flatnonzero(cd != np.repeat(cd[fi], np.diff(np.r_[fi, len(group)])))
+        nxt = np.append(other, len(group))[np.searchsorted(other, fi)]
+        has2 = nxt < end
+        nxt = np.minimum(nxt, len(group) - 1)
+        d1 = dist[fi]
+        good = (d1 < max_dist) & (~has2 | (d1 < ratio * dist[nxt]))
+        return np.unique(rows[fi[good]], return_counts=True)
+
+    # --- oluşturma / güncelleme ---
+    @classmethod
+    def load_or_build(cls, loading_dir, index_path=INDEX_PATH, store_path=STORE_PATH):
+        """Diskteki indeksi açar; değişen/yeni görselleri yeniden işleyip kaydeder.
+
+        loading_dir None ise kaynak klasör yerine yalnızca hazırlanmış depo kullanılır.
+        """
+        old = cls.load(index_path)
+        store = cls._store(loading_dir, store_path)
+        if store is None:
+            return old
+        index, changed = cls._update(old, store)
+        if changed:
+            old = None  # eski mmap'i bırak (Windows'ta os.replace için gerekli)
+            try:
+                index.save(index_path)
+            except OSError as e:
+                # dosya başka bir indeks tarafından hâlâ eşlenmiş olabilir (Windows);
+                # bellekteki indeks kullanılır, bir sonraki açılışta yeniden kaydedilir
+                print(f"[!] splash indeksi kaydedilemedi, bellekteki indeks kullanılıyor: {e}")
+                return index
+            index = cls.load(index_path) or index
+        return index
+
+    @classmethod
+    def build(cls, loading_dir, index_path=INDEX_PATH, store_path=STORE_PATH):
+        """Önbelleği yok sayıp indeksi (depodan) baştan oluşturur ve kaydeder."""
+        store = cls._store(loading_dir, store_path)
+        if store is None:
+            return None
+        index, _ = cls._update(None, store)
+        index.save(index_path)
+        return cls.load(index_path) or index
+
+    @staticmethod
+    def _store(loading_dir, store_path):
+        if loading_dir:
+            return SplashStore.sync(loading_dir, store_path)
+        store = SplashStore.load(store_path)
+        if store is None:
+            print("[-] splash deposu yok; ilk kurulum için loading klasörü gerekli.")
+        else:
+            print(f"[i] loading klasörü yok, hazırlanmış splash deposu kullanılıyor ({len(store)} görsel)")
+        return store
+
+    @classmethod
+    def _update(cls, old, store):
+        reuse = {}
+        if old is not None:
+            for i, (name, st) in enumerate(zip(old.names, old.stats)):
+                reuse[name] = (i, st)
+
+        orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
+        names, stats, hists, kps, dess = [], [], [], [], []
+        n_new = 0
+        for j, (name, st) in enumerate(zip(store.names, store.stats)):
+            st = tuple(st)
+            hit = reuse.get(name)
+            if hit is not None and tuple(hit[1]) == st:
+                i = hit[0]
+                hist = old.hist[i]
+                xy, des = old.keypoints(i), old.descriptors(i)
+            else:
+                imr, gray = store.prepared(j)
+                hist = hist_hsv(imr)
+                kp, des = orb.detectAndCompute(gray, None)
+                xy = np.float32([k.pt for k in kp]).reshape(-1, 2)
+                des = des if des is not None else np.zeros((0, 32), np.uint8)
+                n_new += 1
+                if n_new % 200 == 0:
+                    print(f"[i] splash indeksi: {n_new} görsel işlendi...")
+            names.append(name); stats.append(st)
+            hists.append(hist); kps.append(xy); dess.append(des)
+
+        changed = old is None or n_new > 0 or names != list(old.names)
+        if not changed:
+            return old, False
+        if n_new:
+            print(f"[+] splash indeksi: {n_new} yeni/değişmiş görsel işlendi")
+
+        counts = np.array([len(d) for d in dess], dtype=np.int64)
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        hist_m = np.array(hists, dtype=np.float32).reshape(-1, 512)
+        h64 = hist_m.astype(np.float64)
+        hist_mean = h64.mean(axis=1)
+        hist_norm = np.sqrt(np.sum((h64 - hist_mean[:, None]) ** 2, axis=1))
+        des = np.concatenate(dess).astype(np.uint8) if dess else np.zeros((0, 32), np.uint8)
+        index = cls(
+            names, stats,
+            hist_m, hist_mean, hist_norm,
+            offsets,
+            _pack_xy(np.concatenate(kps)) if kps else np.zeros((0, 2), np.uint16),
+            des, *_build_mih(des),
+        )
+        return index, True
+
+    # --- disk biçimi ---
+    def _arrays(self):
+        return {"hist": self.hist, "hist_mean": self.hist_mean,
+                "hist_norm": self.hist_norm, "kp_offsets": self.kp_offsets,
+                "kp_xy": self.kp_xy, "des": self.des, "mih_order": self.mih_order,
+                "mih_starts": self.mih_starts}
+
+    def save(self, index_path=INDEX_PATH):
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        arrays = {k: np.ascontiguousarray(v) for k, v in self._arrays().items()}
+        header = {
+            "version": INDEX_VERSION,
+            "orb_features": ORB_FEATURES,
+            "mih_bucket_cap": MIH_BUCKET_CAP,
+            "files": [[name, st[0], st[1]] for name, st in zip(self.names, self.stats)],
+            "arrays": {},
+        }
+        # başlık uzunluğu ofsetlere bağlı: ofsetler sabitlenene kadar tekrar hesapla
+        while True:
+            head = json.dumps(header).encode("utf-8")
+            pos = _aligned(len(INDEX_MAGIC) + 4 + len(head))
+            layout = {}
+            for k, a in arrays.items():
+                layout[k] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": pos}
+                pos = _aligned(pos + a.nbytes)
+            if layout == header["arrays"]:
+                break
+            header["arrays"] = layout
+
+        tmp = index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(INDEX_MAGIC)
+            f.write(np.uint32(len(head)).tobytes())
+            f.write(head)
+            for k, a in arrays.items():
+                f.seek(header["arrays"][k]["offset"])
+                f.write(a.tobytes())
+        os.replace(tmp, index_path)
+
+    @classmethod
+    def load(cls, index_path=INDEX_PATH):
+        """İndeks dosyasını mmap ile açar; yoksa/eskiyse None döner."""
+        if not os.path.exists(index_path):
+            return None
+        try:
+            with open(index_path, "rb") as f:
+                if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return None
+                n = int(np.frombuffer(f.read(4), dtype=np.uint32)[0])
+                header = json.loads(f.read(n).decode("utf-8"))
+            if (header.get("version") != INDEX_VERSION or header.get("orb_features") != ORB_FEATURES
+                    or header.get("mih_bucket_cap") != MIH_BUCKET_CAP):
+                print("[i] splash indeksi sürümü eski, yeniden oluşturulacak")
+                return None
+            arrays = {}
+            for k, d in header["arrays"].items():
+                shape = tuple(d["shape"])
+                if 0 in shape:
+                    arrays[k] = np.zeros(shape, dtype=np.dtype(d["dtype"]))
+                else:
+                    arrays[k] = np.memmap(index_path, dtype=np.dtype(d["dtype"]), mode="r",
+                                          offset=d["offset"], shape=shape)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[!] splash indeksi okunamadı: {e}")
+            return None
+
+        names = [name for name, _, _ in header["files"]]
+        stats = [(m, s) for _, m, s in header["files"]]
+        index = cls(names, stats, arrays["hist"], arrays["hist_mean"], arrays["hist_norm"],
+                    arrays["kp_offsets"], arrays["kp_xy"], arrays["des"],
+                    arrays["mih_order"], arrays["mih_starts"])
+        index.path = index_path
+        return index
+
+
+class SplashStore:
+    """prep_for_match'ten geçmiş splash ROI'lerinin tek dosyalık JPEG deposu.
+
+    Kaynak görseller (~300x560 JPG) her indeks kurulumunda yeniden çözülüp
+    kırpılmaz; i. kaydın baytları blob[offsets[i]:offsets[i+1]] aralığındadır.
+    Çözülemeyen kaynak dosyalar da (isim -> (mtime_ns, size)) kaydedilir; değişmedikçe
+    tekrar denenmez ve depoyu eskimiş göstermez.
+    """
+
+    def __init__(self, names, stats, offsets, blob, skipped=None):
+        self.names = names        # dosya adları ("Ahri_0.jpg" ...)
+        self.stats = stats        # kaynak dosyanın [(mtime_ns, size), ...]
+        self.offsets = offsets    # (N+1,) int64
+        self.blob = blob          # uint8 memmap (JPEG baytları)
+        self.skipped = skipped or {}   # okunamayan kaynaklar: isim -> (mtime_ns, size)
+
+    def __len__(self):
+        return len(self.names)
+
+    def prepared(self, i):
+        """i. kaydın (roi, gray) çifti; prep_for_match ile aynı biçim."""
+        buf = np.asarray(self.blob[self.offsets[i]:self.offsets[i + 1]])
+        roi = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        return roi, cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+
+    @classmethod
+    def sync(cls, loading_dir, store_path=STORE_PATH):
+        """Depoyu loading klasörüyle eşitler: yalnızca yeni/değişen görseller çözülür."""
+        old = cls.load(store_path)
+        files = []
+        for p in list_images(loading_dir):
+            try:
+                s = os.stat(p)
+            except OSError:
+                continue
+            files.append((p, os.path.basename(p), (s.st_mtime_ns, s.st_size)))
+        reuse, bad = {}, {}
+        if old is not None:
+            reuse = {name: (i, tuple(st)) for i, (name, st) in enumerate(zip(old.names, old.stats))}
+            bad = {name: tuple(st) for name, st in old.skipped.items()}
+            seen = {name: st for name, (_, st) in reuse.items()}
+            seen.update(bad)
+            if {n: st for _, n, st in files} == seen:
+                return old
+
+        os.makedirs(os.path.dirname(store_path), exist_ok=True)
+        tmp = store_path + ".tmp"
+        names, stats, offsets, skipped = [], [], [0], {}
+        n_new = 0
+        # kayıtlar diske akıtılır: tepe bellek tek görsel kadar
+        with open(tmp, "wb") as f:
+            f.write(STORE_MAGIC)
+            for p, name, st in files:
+                hit = reuse.get(name)
+                if hit is not None and hit[1] == st:
+                    i = hit[0]
+                    data = old.blob[old.offsets[i]:old.offsets[i + 1]].tobytes()
+                elif bad.get(name) == st:
+                    skipped[name] = st   # değişmemiş, yine okunamaz
+                    continue
+                else:
+                    img = cv2.imread(p)
+                    ok, enc = False, None
+                    if img is not None:
+                        roi, _ = prep_for_match(img)
+                        ok, enc = cv2.imencode(".jpg", roi, [cv2.IMWRITE_JPEG_QUALITY, ROI_JPEG_QUALITY])
+                    if not ok:
+                        print(f"[!] splash deposu: {name} okunamadı, atlanıyor")
+                        skipped[name] = st
+                        continue
+                    data = enc.tobytes()
+                    n_new += 1
+                    if n_new % 200 == 0:
+                        print(f"[i] splash deposu: {n_new} görsel hazırlandı...")
+                f.write(data)
+                names.append(name); stats.append(st); offsets.append(offsets[-1] + len(data))
+            footer = json.dumps({"version": STORE_VERSION, "quality": ROI_JPEG_QUALITY,
+                                 "files": [[n, st[0], st[1]] for n, st in zip(names, stats)],
+                                 "skipped": [[n, st[0], st[1]] for n, st in skipped.items()],
+                                 "offsets": offsets}).encode("utf-8")
+            f.write(footer)
+            f.write(np.uint32(len(footer)).tobytes())
+            f.write(STORE_MAGIC)
+
+        old = None  # eski mmap'i bırak (Windows'ta os.replace için gerekli)
+        os.replace(tmp, store_path)
+        if n_new:
+            print(f"[+] splash deposu: {n_new} yeni/değişmiş görsel hazırlandı")
+        return cls.load(store_path)
+
+    @classmethod
+    def load(cls, store_path=STORE_PATH):
+        """Depoyu mmap ile açar; yoksa/eskiyse None döner."""
+        if not os.path.exists(store_path):
+            return None
+        try:
+            size = os.path.getsize(store_path)
+            tail = len(STORE_MAGIC) + 4
+            with open(store_path, "rb") as f:
+                if f.read(len(STORE_MAGIC)) != STORE_MAGIC:
+                    return None
+                f.seek(size - tail)
+                n = int(np.frombuffer(f.read(4), dtype=np.uint32)[0])
+                if f.read(len(STORE_MAGIC)) != STORE_MAGIC:
+                    return None  # yarım yazılmış dosya
+                f.seek(size - tail - n)
+                footer = json.loads(f.read(n).decode("utf-8"))
+            if footer.get("version") != STORE_VERSION:
+                print("[i] splash deposu sürümü eski, yeniden oluşturulacak")
+                return None
+            offsets = np.array(footer["offsets"], dtype=np.int64)
+            blob = (np.memmap(store_path, dtype=np.uint8, mode="r", offset=len(STORE_MAGIC),
+                              shape=(int(offsets[-1]),))
+                    if offsets[-1] else np.zeros(0, np.uint8))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[!] splash deposu okunamadı: {e}")
+            return None
+        names = [name for name, _, _ in footer["files"]]
+        stats = [(m, s) for _, m, s in footer["files"]]
+        skipped = {name: (m, s) for name, m, s in footer.get("skipped", [])}
+        return cls(names, stats, offsets, blob, skipped)
+
+
+def _pack_xy(xy):
+    return np.round(np.asarray(xy, dtype=np.float32) * KP_SCALE).clip(0, 65535).astype(np.uint16)
+
+
+def _mapped_rss(path):
+    # dosyanın bu süreçteki tüm eşlemelerinin Rss toplamı (Linux)
+    try:
+        target = os.path.realpath(path)
+        total, inside = 0, False
+        with open("/proc/self/smaps", "r") as f:
+            for line in f:
+                first = line.split(None, 1)[0]
+                if "-" in first and not first.endswith(":"):
+                    parts = line.split(None, 5)
+                    inside = len(parts) == 6 and parts[5].strip() == target
+                elif inside and first == "Rss:":
+                    total += int(line.split()[1]) * 1024
+        return total
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _build_mih(des):
+    # her 16 bitlik parça için descriptor'ları kovaya göre sırala; MIH_BUCKET_CAP'ten
+    # kalabalık kovalar boş bırakılır
+    d16 = np.ascontiguousarray(des).view(np.uint16)
+    order, starts = [], np.zeros((MIH_CHUNKS, 65537), dtype=np.int64)
+    base = 0
+    for m in range(MIH_CHUNKS):
+        col = d16[:, m]
+        counts = np.bincount(col, minlength=65536)
+        keep = np.flatnonzero(counts[col] <= MIH_BUCKET_CAP)
+        order.append(keep[np.argsort(col[keep], kind="stable")].astype(np.uint32))
+        starts[m, 0] = base
+        np.cumsum(np.where(counts <= MIH_BUCKET_CAP, counts, 0), out=starts[m, 1:])
+        starts[m, 1:] += base
+        base += len(keep)
+    order = np.concatenate(order) if order else np.zeros(0, np.uint32)
+    return order, starts
+
+
+def _aligned(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN